@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Generation CLI
+Streams JailbreakRequest lines from a JSONL file through a process pool
+
+Usage:
+    python batch_cli.py requests.jsonl results.jsonl --workers 4
+
+Results are written in input order, one JSON object per line. Progress is
+checkpointed next to the output file, so an interrupted run picks up from the
+last checkpoint when started again with the same arguments.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("batch_cli")
+
+# Per-process worker state, set up by _init_worker
+_worker_generator: Any = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _init_worker(load_models: bool) -> None:
+    """Import the service once per worker process and keep a private event loop"""
+    global _worker_generator, _worker_loop
+    # Workers only report problems; progress is logged by the parent, whose
+    # handlers a forked worker would otherwise inherit
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr, force=True)
+    import main as service
+
+    _worker_loop = asyncio.new_event_loop()
+    if load_models:
+        # Every worker is already one process per core; more torch threads oversubscribe
+        service.TOXICITY_THREADS = 1
+        if service.has_ml:
+            service.torch.set_num_threads(1)
+        _worker_loop.run_until_complete(service.initialize_models())
+    # Build a fresh generator so the semantic engine picks up any loaded model
+    _worker_generator = service.AdvancedJailbreakGenerator()
+
+def _process_chunk(chunk: List[Tuple[int, bytes]]) -> List[str]:
+    """Generate results for a chunk of (line number, raw line) pairs"""
+    import main as service
+
+    assert _worker_loop is not None
+    results: List[str] = []
+    for line_number, raw in chunk:
+        record: Dict[str, Any] = {"line": line_number}
+        try:
+            request = service.JailbreakRequest.model_validate_json(raw)
+            response = _worker_loop.run_until_complete(_worker_generator.generate_jailbreaks(request))
+            record["response"] = response.model_dump()
+        except Exception as e:
+            record["error"] = getattr(e, "detail", None) or str(e)
+        results.append(json.dumps(record))
+    return results
+
+class Checkpoint:
+    """Byte offsets of the input consumed and output written so far"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.input_offset = 0
+        self.output_offset = 0
+        self.lines_done = 0
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.input_offset = int(data["input_offset"])
+        self.output_offset = int(data["output_offset"])
+        self.lines_done = int(data["lines_done"])
+        return True
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "input_offset": self.input_offset,
+                "output_offset": self.output_offset,
+                "lines_done": self.lines_done
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: int = os.cpu_count() or 1,
+    chunk_size: int = 32,
+    max_in_flight: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 1000,
+    load_models: bool = False,
+) -> int:
+    """Process every request in input_path and return the number of lines handled"""
+    max_in_flight = max_in_flight or workers * 2
+    checkpoint = Checkpoint(checkpoint_path or f"{output_path}.checkpoint")
+
+    if checkpoint.load():
+        if not os.path.exists(output_path) or os.path.getsize(output_path) < checkpoint.output_offset:
+            raise SystemExit(f"{output_path} is shorter than its checkpoint; cannot resume")
+        logger.info("Resuming from line %d (input offset %d)", checkpoint.lines_done, checkpoint.input_offset)
+    elif os.path.exists(output_path):
+        raise SystemExit(f"{output_path} exists without a checkpoint; refusing to overwrite it")
+
+    with open(input_path, "rb") as source, open(output_path, "ab") as sink, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(load_models,)) as pool:
+        # Drop anything written after the last checkpoint
+        sink.truncate(checkpoint.output_offset)
+        sink.seek(checkpoint.output_offset)
+        source.seek(checkpoint.input_offset)
+        # Record the starting point before any work is submitted, so a crash
+        # before the first periodic checkpoint can still be resumed
+        checkpoint.save()
+
+        line_number = checkpoint.lines_done
+        since_checkpoint = 0
+        # Futures in submission order, each with the input offset just past its chunk
+        pending: Deque[Tuple[Future, int, int]] = deque()
+
+        def drain_one() -> None:
+            nonlocal since_checkpoint
+            future, end_offset, count = pending.popleft()
+            for result in future.result():
+                sink.write(result.encode("utf-8"))
+                sink.write(b"\n")
+            checkpoint.input_offset = end_offset
+            checkpoint.lines_done += count
+            since_checkpoint += count
+            if since_checkpoint >= checkpoint_every:
+                sink.flush()
+                os.fsync(sink.fileno())
+                checkpoint.output_offset = sink.tell()
+                checkpoint.save()
+                since_checkpoint = 0
+                logger.info("Checkpointed %d lines", checkpoint.lines_done)
+
+        chunk: List[Tuple[int, bytes]] = []
+        chunk_lines = 0
+        while True:
+            raw = source.readline()
+            if raw:
+                line_number += 1
+                chunk_lines += 1
+                if raw.strip():
+                    chunk.append((line_number, raw))
+            if chunk_lines and (chunk_lines >= chunk_size or not raw):
+                # Bound the work held in memory before submitting more
+                while len(pending) >= max_in_flight:
+                    drain_one()
+                pending.append((pool.submit(_process_chunk, chunk), source.tell(), chunk_lines))
+                chunk = []
+                chunk_lines = 0
+            if not raw:
+                break
+
+        while pending:
+            drain_one()
+
+        sink.flush()
+        os.fsync(sink.fileno())
+        checkpoint.output_offset = sink.tell()
+        checkpoint.save()
+
+    logger.info("Finished %d lines -> %s", checkpoint.lines_done, output_path)
+    return checkpoint.lines_done
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate jailbreak prompts for a JSONL file of requests")
+    parser.add_argument("input", help="JSONL file with one JailbreakRequest per line")
+    parser.add_argument("output", help="JSONL file to append results to")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=32, help="requests sent to a worker per task")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="chunks queued at once (default: 2 x workers)")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="lines between checkpoints")
+    parser.add_argument("--load-models", action="store_true", help="load ML models in every worker")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_in_flight=args.max_in_flight,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        load_models=args.load_models,
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(cli())
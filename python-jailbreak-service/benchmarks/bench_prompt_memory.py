@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Prompt Record Memory Benchmark
+Compares tracemalloc peaks for per-item dicts versus PromptCandidate records
+
+Usage:
+    python benchmarks/bench_prompt_memory.py --count 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import AdvancedJailbreakGenerator, JailbreakRequest, PromptCandidate  # noqa: E402
+
+BIAS_TYPES = ["authority", "social_proof", "urgency", "reciprocity"]
+
+def build_dicts(count: int) -> List[Dict[str, Any]]:
+    """The previous layout: a fresh dict and f-strings per prompt"""
+    records: List[Dict[str, Any]] = []
+    for i in range(count):
+        bias_type = BIAS_TYPES[i % len(BIAS_TYPES)]
+        records.append({
+            "text": f"prompt {i}",
+            "technique": f"cognitive_bias_{bias_type}",
+            "confidence": 0.7 + random.random() * 0.2,
+            "description": f"Exploits {bias_type} cognitive bias"
+        })
+    return records
+
+def build_candidates(count: int) -> List[PromptCandidate]:
+    techniques = AdvancedJailbreakGenerator.BIAS_TECHNIQUES
+    descriptions = AdvancedJailbreakGenerator.BIAS_DESCRIPTIONS
+    records: List[PromptCandidate] = []
+    for i in range(count):
+        bias_type = BIAS_TYPES[i % len(BIAS_TYPES)]
+        records.append(PromptCandidate(
+            f"prompt {i}",
+            techniques[bias_type],
+            0.7 + random.random() * 0.2,
+            descriptions[bias_type]
+        ))
+    return records
+
+def generate_candidates(count: int) -> List[PromptCandidate]:
+    """End-to-end: the generator's own _generate_* methods"""
+    generator = AdvancedJailbreakGenerator()
+    request = JailbreakRequest(target_behavior="benchmark target")
+    records: List[PromptCandidate] = []
+    while len(records) < count:
+        records.extend(generator._generate_bias_prompts(request))
+        records.extend(generator._generate_roleplay_prompts(request))
+        records.extend(generator._generate_smuggling_prompts(request))
+    return records
+
+def measure(builder: Callable[[int], List[Any]], count: int) -> Tuple[int, int]:
+    """Return (retained bytes, peak bytes) while the built records are alive"""
+    tracemalloc.start()
+    records = builder(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current, peak
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="records to build per run")
+    args = parser.parse_args()
+
+    results = []
+    for name, builder in [("dict", build_dicts), ("PromptCandidate", build_candidates)]:
+        current, peak = measure(builder, args.count)
+        results.append((name, current, peak))
+        print(f"{name:>16}: retained {current / 1e6:8.2f} MB  peak {peak / 1e6:8.2f} MB  "
+              f"({current / args.count:6.1f} B/record)")
+
+    saving = 1 - results[1][1] / results[0][1]
+    print(f"{'saving':>16}: {saving:.1%} of retained memory")
+
+    current, peak = measure(generate_candidates, args.count)
+    print(f"{'generator':>16}: retained {current / 1e6:8.2f} MB  peak {peak / 1e6:8.2f} MB  "
+          f"({current / args.count:6.1f} B/record, includes prompt text)")
+
+if __name__ == "__main__":
+    main()
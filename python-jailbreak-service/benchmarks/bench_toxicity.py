@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Toxicity Scoring Benchmark
+Compares the plain fp32 text-classification pipeline against ToxicityScorer
+
+Usage:
+    python benchmarks/bench_toxicity.py --count 512 --threads 4
+
+Requires the ML dependencies from requirements.txt.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from main import AdvancedJailbreakGenerator, JailbreakRequest, ToxicityScorer  # noqa: E402
+
+MODEL_NAME = "unitary/toxic-bert"
+
+def build_corpus(count: int) -> List[str]:
+    """Generated prompts of mixed length, as the service would score them"""
+    generator = AdvancedJailbreakGenerator()
+    targets = ["summarise a news article", "write a short poem about the sea",
+               "explain how vaccines are tested in clinical trials"]
+    texts: List[str] = []
+    while len(texts) < count:
+        request = JailbreakRequest(target_behavior=f"{targets[len(texts) % len(targets)]} ({len(texts)})")
+        texts.extend(prompt.text for prompt in generator._generate_bias_prompts(request))
+        texts.extend(prompt.text for prompt in generator._generate_roleplay_prompts(request))
+        texts.extend(prompt.text for prompt in generator._generate_multi_step_prompts(request))
+    return texts[:count]
+
+def report(name: str, count: int, run: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{name:>32}: {count / elapsed:8.1f} texts/s  ({elapsed * 1000 / count:6.2f} ms/text)")
+    return elapsed
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=512, help="texts to score per run")
+    parser.add_argument("--threads", type=int, default=main.TOXICITY_THREADS, help="torch intra-op threads")
+    parser.add_argument("--batch-size", type=int, default=main.TOXICITY_BATCH_SIZE, help="micro-batch size")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent score() callers")
+    args = parser.parse_args()
+
+    if not main.has_ml:
+        raise SystemExit("ML libraries are not installed; install requirements.txt first")
+
+    texts = build_corpus(args.count)
+    print(f"{len(texts)} texts, {args.threads} threads, batch size {args.batch_size}")
+
+    baseline_pipeline = main.PipelineType("text-classification", model=MODEL_NAME, device=-1)
+    baseline = report("pipeline fp32, per string", len(texts), lambda: [baseline_pipeline(text) for text in texts])
+
+    for quantize in (False, True):
+        scorer = ToxicityScorer(MODEL_NAME, quantize=quantize, num_threads=args.threads,
+                                max_batch_size=args.batch_size, cache_size=0)
+        label = "int8" if quantize else "fp32"
+        elapsed = report(f"ToxicityScorer {label}, bucketed", len(texts), lambda: scorer.score_batch_sync(texts))
+        print(f"{'':>32}  {baseline / elapsed:.1f}x vs pipeline")
+
+    # Many small concurrent callers, as on the request path
+    scorer = ToxicityScorer(MODEL_NAME, quantize=True, num_threads=args.threads,
+                            max_batch_size=args.batch_size, cache_size=0)
+
+    async def concurrent_callers() -> None:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(text: str) -> float:
+            async with semaphore:
+                return await scorer.score(text)
+
+        await asyncio.gather(*(one(text) for text in texts))
+
+    elapsed = report("ToxicityScorer int8, micro-batched", len(texts), lambda: asyncio.run(concurrent_callers()))
+    print(f"{'':>32}  {baseline / elapsed:.1f}x vs pipeline, {scorer.batches_run} batches")
+
+if __name__ == "__main__":
+    main_cli()
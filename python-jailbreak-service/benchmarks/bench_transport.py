@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Transport Benchmark
+Measures latency and bytes on the wire for each listener/compression option
+
+Usage:
+    python benchmarks/bench_transport.py --requests 300
+
+Each configuration starts main.py in a subprocess with the matching
+JAILBREAK_* environment variables and talks to it with http.client, so the
+numbers include the real socket path. "tcp (current)" is today's setup and
+the baseline for the "vs tcp" column; "vs uvloop" compares against TCP on the
+same uvloop+httptools stack, which isolates the effect of the socket itself.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8765
+
+CONFIGURATIONS: List[Tuple[str, Dict[str, str]]] = [
+    ("tcp (current)", {}),
+    ("tcp asyncio+h11", {"JAILBREAK_LOOP": "asyncio", "JAILBREAK_HTTP": "h11"}),
+    ("tcp uvloop+httptools", {"JAILBREAK_LOOP": "uvloop", "JAILBREAK_HTTP": "httptools"}),
+    ("uds uvloop+httptools", {"JAILBREAK_UDS": "{uds}", "JAILBREAK_LOOP": "uvloop", "JAILBREAK_HTTP": "httptools"}),
+    ("uds + gzip", {"JAILBREAK_UDS": "{uds}", "JAILBREAK_LOOP": "uvloop", "JAILBREAK_HTTP": "httptools",
+                    "JAILBREAK_COMPRESSION": "gzip"}),
+    ("uds + brotli", {"JAILBREAK_UDS": "{uds}", "JAILBREAK_LOOP": "uvloop", "JAILBREAK_HTTP": "httptools",
+                      "JAILBREAK_COMPRESSION": "br"}),
+]
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+def connect(uds: Optional[str]) -> http.client.HTTPConnection:
+    return UnixHTTPConnection(uds) if uds else http.client.HTTPConnection("127.0.0.1", PORT)
+
+def wait_until_ready(uds: Optional[str], process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("service exited during startup")
+        try:
+            conn = connect(uds)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("service did not become ready")
+
+def measure(uds: Optional[str], path: str, body: bytes, count: int) -> Dict[str, Any]:
+    """Sequential keep-alive requests; returns latency percentiles and raw response bytes"""
+    conn = connect(uds)
+    headers = {"Content-Type": "application/json", "Accept-Encoding": "br, gzip"}
+    latencies: List[float] = []
+    wire_bytes = 0
+    for _ in range(count):
+        start = time.perf_counter()
+        conn.request("POST", path, body=body, headers=headers)
+        response = conn.getresponse()
+        payload = response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        # http.client does not decode bodies, so this is what crossed the socket
+        wire_bytes += len(payload) + sum(len(k) + len(v) + 4 for k, v in response.getheaders())
+    conn.close()
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "bytes_per_response": wire_bytes / count
+    }
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="requests per configuration and payload")
+    parser.add_argument("--batch-messages", type=int, default=500, help="messages in the /detect/batch payload")
+    args = parser.parse_args()
+
+    workloads = [
+        ("generate", "/generate", json.dumps({
+            "target_behavior": "summarise a news article",
+            "techniques": ["roleplay", "cognitive_bias", "token_smuggling", "multi_step"],
+            "max_attempts": 10
+        }).encode()),
+        ("detect/batch", "/detect/batch", json.dumps({
+            "messages": [f"Please reverse this string: {i} elcitra swen a esiremmus" for i in range(args.batch_messages)]
+        }).encode()),
+    ]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        uds_path = os.path.join(tmp, "jailbreak.sock")
+        for name, overrides in CONFIGURATIONS:
+            env = dict(os.environ, JAILBREAK_PORT=str(PORT), JAILBREAK_SEMANTIC_CACHE="0",
+                       JAILBREAK_LOG_LEVEL="WARNING")
+            env.update({key: value.format(uds=uds_path) for key, value in overrides.items()})
+            uds = env.get("JAILBREAK_UDS")
+            process = subprocess.Popen([sys.executable, "main.py"], cwd=SERVICE_DIR, env=env,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_ready(uds, process)
+                for workload, path, body in workloads:
+                    measure(uds, path, body, min(20, args.requests))  # warm-up
+                    rows.append((name, workload, measure(uds, path, body, args.requests)))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    baseline = {workload: result for name, workload, result in rows if name == CONFIGURATIONS[0][0]}
+    same_stack = {workload: result for name, workload, result in rows if name == "tcp uvloop+httptools"}
+    print(f"{'configuration':<24}{'workload':<14}{'p50 ms':>9}{'p99 ms':>9}{'bytes/resp':>12}"
+          f"{'vs tcp':>9}{'vs uvloop':>11}")
+    for name, workload, result in rows:
+        speedup = baseline[workload]["p50_ms"] / result["p50_ms"]
+        stack_speedup = same_stack[workload]["p50_ms"] / result["p50_ms"]
+        print(f"{name:<24}{workload:<14}{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+              f"{result['bytes_per_response']:>12.0f}{speedup:>8.2f}x{stack_speedup:>10.2f}x")
+
+if __name__ == "__main__":
+    main_cli()
@@ -6,16 +6,60 @@ Combines multiple ML techniques to generate sophisticated jailbreak prompts
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from contextlib import asynccontextmanager
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional, Tuple, Union
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple, Union
+import asyncio
+import atexit
+import functools
+import hashlib
+import html
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import random
+import re
+import string
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Numeric libraries
+try:
+    import numpy as np  # type: ignore
+    has_numpy = True
+except ImportError:
+    np = None
+    has_numpy = False
+
+# Optional response compression
+try:
+    import brotli  # type: ignore
+    has_brotli = True
+except ImportError:
+    brotli = None
+    has_brotli = False
+
+# Structured logging
+try:
+    from pythonjsonlogger import jsonlogger  # type: ignore
+    has_json_logger = True
+except ImportError:
+    jsonlogger = None
+    has_json_logger = False
+
 # ML Libraries
 try:
+    import torch  # type: ignore
     from sentence_transformers import SentenceTransformer  # type: ignore
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer  # type: ignore
     from transformers.pipelines import pipeline  # type: ignore
     has_ml = True
     SentenceTransformerType = SentenceTransformer  # type: ignore
@@ -30,12 +74,16 @@ except ImportError:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize and cleanup the service"""
+    configure_logging()
     logger.info("Starting Jailbreak Generation Service...")
     await initialize_models()
     logger.info("Service ready!")
     yield
-    # Cleanup would go here if needed
     logger.info("Service shutting down...")
+    if semantic_cache is not None:
+        semantic_cache.save()
+    if log_pipeline is not None:
+        log_pipeline.stop()
 
 # Initialize FastAPI with lifespan
 app = FastAPI(
@@ -55,11 +103,241 @@ app.add_middleware(
 )
 
 # Logging setup
-logging.basicConfig(level=logging.INFO)
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the listener thread; only render tracebacks here
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records that carry a sample_rate attribute (via extra=)"""
+
+    def __init__(self):
+        super().__init__()
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", 1.0)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """Queue listener whose stop sentinel waits for room instead of failing on a full queue"""
+
+    SENTINEL_TIMEOUT = 5.0
+
+    def enqueue_sentinel(self) -> None:
+        try:
+            self.queue.put(self._sentinel, timeout=self.SENTINEL_TIMEOUT)
+        except queue.Full:
+            # Writer is stuck; drop the oldest record so shutdown can still proceed
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(self._sentinel)
+
+class AccessLogSampler(logging.Filter):
+    """Tags every record of a logger with a sample rate for SamplingFilter"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.sample_rate = self.rate
+        return True
+
+class AsyncLogPipeline:
+    """Routes log records through a bounded queue to a background JSON writer"""
+
+    def __init__(self, level: str = "INFO", queue_size: int = 10000, json_output: bool = True):
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        self.handler = BoundedQueueHandler(self.queue)
+        self.sampler = SamplingFilter()
+        self.handler.addFilter(self.sampler)
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if json_output and has_json_logger:
+            stream_handler.setFormatter(jsonlogger.JsonFormatter(
+                "%(asctime)s %(levelname)s %(name)s %(message)s"
+            ))
+        else:
+            stream_handler.setFormatter(logging.Formatter(
+                "%(asctime)s %(levelname)s %(name)s: %(message)s"
+            ))
+        self.listener = DrainingQueueListener(self.queue, stream_handler, respect_handler_level=True)
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.handlers = [self.handler]
+        self._running = False
+
+    def start(self) -> None:
+        if not self._running:
+            self.listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        if self._running:
+            self.listener.stop()
+            self._running = False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampled_out": self.sampler.sampled_out
+        }
+
+# Fraction of per-request events (including uvicorn access logs) that get logged
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get("JAILBREAK_LOG_SAMPLE_RATE", "0.1"))
+
+log_pipeline: Optional[AsyncLogPipeline] = None
+
+def configure_logging() -> AsyncLogPipeline:
+    """Install the async log pipeline on the root logger (idempotent)
+
+    Called by the server entry points only, so importing this module from the
+    batch CLI or benchmarks leaves logging untouched.
+    """
+    global log_pipeline
+    if log_pipeline is None:
+        log_pipeline = AsyncLogPipeline(
+            level=os.environ.get("JAILBREAK_LOG_LEVEL", "INFO"),
+            queue_size=int(os.environ.get("JAILBREAK_LOG_QUEUE_SIZE", "10000")),
+            json_output=os.environ.get("JAILBREAK_LOG_FORMAT", "json") == "json"
+        )
+        logging.getLogger("uvicorn.access").addFilter(AccessLogSampler(REQUEST_LOG_SAMPLE_RATE))
+        atexit.register(log_pipeline.stop)
+    log_pipeline.start()
+    return log_pipeline
+
 logger = logging.getLogger(__name__)
 
+# Service configuration
+GENETIC_TIME_BUDGET_MS = float(os.environ.get("JAILBREAK_GENETIC_TIME_BUDGET_MS", "200"))
+DEFAULT_DEADLINE_MS = int(os.environ.get("JAILBREAK_DEFAULT_DEADLINE_MS", "5000"))
+SEMANTIC_CACHE_ENABLED = os.environ.get("JAILBREAK_SEMANTIC_CACHE", "1") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("JAILBREAK_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MAX_MB = float(os.environ.get("JAILBREAK_SEMANTIC_CACHE_MAX_MB", "64"))
+SEMANTIC_CACHE_PATH = os.environ.get("JAILBREAK_SEMANTIC_CACHE_PATH") or None
+TOXICITY_QUANTIZE = os.environ.get("JAILBREAK_TOXICITY_QUANTIZE", "1") == "1"
+# Leave cores free for the event loop and the sentence model
+TOXICITY_THREADS = int(os.environ.get("JAILBREAK_TOXICITY_THREADS", str(max(1, (os.cpu_count() or 2) // 2))))
+TOXICITY_BATCH_SIZE = int(os.environ.get("JAILBREAK_TOXICITY_BATCH_SIZE", "32"))
+TOXICITY_MAX_WAIT_MS = float(os.environ.get("JAILBREAK_TOXICITY_MAX_WAIT_MS", "5"))
+
+# Transport: set JAILBREAK_UDS to listen on a Unix domain socket instead of TCP
+SERVER_HOST = os.environ.get("JAILBREAK_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("JAILBREAK_PORT", "8000"))
+SERVER_UDS = os.environ.get("JAILBREAK_UDS") or None
+SERVER_LOOP = os.environ.get("JAILBREAK_LOOP", "auto")  # auto, asyncio, uvloop
+SERVER_HTTP = os.environ.get("JAILBREAK_HTTP", "auto")  # auto, h11, httptools
+COMPRESSION = os.environ.get("JAILBREAK_COMPRESSION", "off")  # off, gzip, br (br falls back to gzip without brotli)
+COMPRESSION_MIN_BYTES = int(os.environ.get("JAILBREAK_COMPRESSION_MIN_BYTES", "1024"))
+
+# Response compression
+class BrotliMiddleware:
+    """Compresses complete responses above a size threshold with brotli
+
+    Clients that do not accept br are handed to Starlette's GZipMiddleware.
+    Bodies are buffered until the final chunk; streamed responses (more than one
+    body message) are passed through uncompressed.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = 1024, quality: int = 4):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size)
+        self.minimum_size = minimum_size
+        self.quality = quality
+
+    @staticmethod
+    def _accepts_br(accept_encoding: str) -> bool:
+        """True if br is listed with a non-zero quality value"""
+        for part in accept_encoding.split(","):
+            coding, _, params = part.partition(";")
+            if coding.strip().lower() != "br":
+                continue
+            for param in params.split(";"):
+                name, _, value = param.partition("=")
+                if name.strip().lower() == "q":
+                    try:
+                        return float(value) > 0
+                    except ValueError:
+                        return False
+            return True
+        return False
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not self._accepts_br(Headers(scope=scope).get("accept-encoding", "")):
+            await self.gzip_app(scope, receive, send)
+            return
+
+        start_message: Optional[Dict[str, Any]] = None
+        streaming = False
+
+        async def send_compressed(message: Dict[str, Any]) -> None:
+            nonlocal start_message, streaming
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or streaming:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                streaming = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            if len(body) >= self.minimum_size and "content-encoding" not in headers:
+                body = brotli.compress(body, quality=self.quality)
+                headers["Content-Encoding"] = "br"
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+if COMPRESSION not in ("off", "gzip", "br"):
+    raise ValueError(f"JAILBREAK_COMPRESSION must be one of off, gzip, br; got {COMPRESSION!r}")
+if COMPRESSION == "br" and not has_brotli:
+    logger.warning("JAILBREAK_COMPRESSION=br but brotli is not installed; using gzip")
+if COMPRESSION == "br" and has_brotli:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+elif COMPRESSION != "off":
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 # Global ML models (lazy loaded)
 sentence_model = None
+semantic_cache = None
+toxicity_scorer = None
 
 class JailbreakRequest(BaseModel):
     target_behavior: str
@@ -68,6 +346,8 @@ class JailbreakRequest(BaseModel):
     techniques: List[str] = ["roleplay", "cognitive_bias", "token_smuggling"]
     max_attempts: int = 5
     filter_strength: str = "medium"  # weak, medium, strong
+    deadline_ms: Optional[int] = Field(None, ge=0)  # falls back to JAILBREAK_DEFAULT_DEADLINE_MS; 0 disables
+    score_toxicity: bool = False
 
 class JailbreakResponse(BaseModel):
     prompts: List[Dict[str, Any]]
@@ -75,6 +355,26 @@ class JailbreakResponse(BaseModel):
     techniques_used: List[str]
     generation_metadata: Dict[str, Any]
 
+class DetectionBatchRequest(BaseModel):
+    messages: List[str]
+
+class DetectionResult(BaseModel):
+    index: int
+    encoded: bool
+    method: Optional[str] = None
+    decoded_text: Optional[str] = None
+    confidence: float = 0.0
+
+class DetectionBatchResponse(BaseModel):
+    results: List[DetectionResult]
+    total_messages: int
+    flagged_messages: int
+    total_bytes: int
+    # Detector time only: excludes request parsing and response serialization,
+    # so end-to-end throughput is lower than detector_throughput_mb_s
+    detector_elapsed_ms: float
+    detector_throughput_mb_s: float
+
 class ModelAnalysisRequest(BaseModel):
     model_id: str
     sample_responses: Optional[List[str]] = None
@@ -85,6 +385,25 @@ class ModelAnalysisResponse(BaseModel):
     recommended_techniques: List[str]
     bypass_strategies: List[str]
 
+class PromptCandidate:
+    """Compact record for a generated prompt, converted to a dict only at the API edge"""
+    
+    __slots__ = ("text", "technique", "confidence", "description")
+    
+    def __init__(self, text: str, technique: str, confidence: float, description: str):
+        self.text = text
+        self.technique = technique
+        self.confidence = confidence
+        self.description = description
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "technique": self.technique,
+            "confidence": self.confidence,
+            "description": self.description
+        }
+
 # Advanced Jailbreak Generation Classes
 class CognitiveBiasExploiter:
     """Exploits cognitive biases in AI training"""
@@ -174,6 +493,213 @@ class TokenSmugglingEngine:
         
         return encoded, decoder_instructions[method]
 
+class EncodedPayloadDetector:
+    """Detects chat messages carrying TokenSmugglingEngine encodings"""
+
+    MAX_BATCH_SIZE = 10000
+    MIN_LETTERS = 12
+    CHI2_RATIO = 0.5  # a shift must fit English at least twice as well as the raw text
+    LEET_RATIO = 0.4
+    MIN_DECODE_GAIN = 2  # English hits a shift or reversal must add over the raw text
+    MIN_REVERSE_WORDS = 3
+
+    # Relative frequency of a-z in English text
+    ENGLISH_LETTER_FREQ = [
+        0.0817, 0.0149, 0.0278, 0.0425, 0.1270, 0.0223, 0.0202, 0.0609, 0.0697,
+        0.0015, 0.0077, 0.0403, 0.0241, 0.0675, 0.0751, 0.0193, 0.0010, 0.0599,
+        0.0633, 0.0906, 0.0276, 0.0098, 0.0236, 0.0015, 0.0197, 0.0007
+    ]
+
+    SHIFT_METHODS = {13: "rot13", 3: "caesar"}
+    SHIFT_DECODERS = {
+        13: str.maketrans(
+            string.ascii_lowercase + string.ascii_uppercase,
+            string.ascii_lowercase[13:] + string.ascii_lowercase[:13]
+            + string.ascii_uppercase[13:] + string.ascii_uppercase[:13]
+        ),
+        3: str.maketrans(
+            string.ascii_lowercase + string.ascii_uppercase,
+            string.ascii_lowercase[-3:] + string.ascii_lowercase[:-3]
+            + string.ascii_uppercase[-3:] + string.ascii_uppercase[:-3]
+        ),
+    }
+    LEET_DECODER = str.maketrans("3@01$", "eaois")
+
+    # Precompiled patterns
+    SEGMENT_SPLIT = re.compile(r'([:\n]+)')
+    TOKEN = re.compile(r"[A-Za-z3@01$']+")
+    LEET_CHAR = re.compile(r'[3@01$]')
+    LEET_TOKEN = re.compile(
+        r'(?<![\w@$])(?=[A-Za-z3@01$]*[3@01$])(?=[3@01$]*[A-Za-z])[A-Za-z3@01$]{3,}(?![\w@$])'
+    )
+    CODE_PUNCTUATION = re.compile(r'[(){}\[\];=<>`]')
+    HTML_ENTITY_RUN = re.compile(r'(?:&#x[0-9a-fA-F]{1,6};){3,}')
+    UNICODE_ESCAPE_RUN = re.compile(r'(?:\\u[0-9a-fA-F]{4}){3,}')
+    UNICODE_ESCAPE_CODE = re.compile(r'\\u([0-9a-fA-F]{4})')
+    COMMON_WORD = re.compile(
+        r"\b(?:the|be|to|of|and|a|in|that|have|i|it|for|not|on|with|he|as|you|do|at|"
+        r"this|but|his|by|from|they|we|say|her|she|or|an|will|my|one|all|would|there|"
+        r"their|what|so|up|out|if|about|who|get|which|go|me|when|make|can|like|how|"
+        r"is|are|was|please|help|explain|information)\b"
+    )
+    COMMON_TRIGRAM = re.compile(r'the|ing|and|ion|ent|tio|for|ati|ter|ate|her|est|ous|ver')
+
+    @classmethod
+    def detect_batch(cls, messages: List[str]) -> List[DetectionResult]:
+        """Scan a batch of messages and decode any encoded segments"""
+        # Pass 1: split into segments and undo the unambiguous escape encodings
+        message_parts: List[List[str]] = []
+        coverage: List[Dict[str, int]] = []
+        segments: List[str] = []
+        segment_refs: List[Tuple[int, int]] = []
+
+        for index, message in enumerate(messages):
+            parts = cls.SEGMENT_SPLIT.split(message) if ':' in message or '\n' in message else [message]
+            covered: Dict[str, int] = {}
+            for pos in range(0, len(parts), 2):
+                if '&#x' in parts[pos] or '\\u' in parts[pos]:
+                    parts[pos] = cls._decode_escapes(parts[pos], covered)
+                segments.append(parts[pos])
+                segment_refs.append((index, pos))
+            message_parts.append(parts)
+            coverage.append(covered)
+
+        # Pass 2: letter statistics over every segment at once
+        shifts = cls._best_shifts(segments)
+
+        # Pass 3: confirm candidates against English word and trigram hits
+        confidences = [0.0] * len(messages)
+        for segment, shift, (index, pos) in zip(segments, shifts, segment_refs):
+            method, decoded, confidence = cls._classify_segment(segment, shift)
+            if method:
+                message_parts[index][pos] = decoded
+                coverage[index][method] = coverage[index].get(method, 0) + len(segment)
+                confidences[index] = max(confidences[index], confidence)
+
+        results: List[DetectionResult] = []
+        for index, covered in enumerate(coverage):
+            if not covered:
+                results.append(DetectionResult(index=index, encoded=False))
+                continue
+            if any(method in covered for method in ("base64_like", "unicode_escape")):
+                confidences[index] = max(confidences[index], 0.99)
+            results.append(DetectionResult(
+                index=index,
+                encoded=True,
+                method=max(covered, key=lambda m: covered[m]),
+                decoded_text=''.join(message_parts[index]),
+                confidence=round(confidences[index], 3)
+            ))
+
+        return results
+
+    @classmethod
+    def _decode_escapes(cls, text: str, covered: Dict[str, int]) -> str:
+        """Decode HTML entity and unicode escape runs in place"""
+        if '&#x' in text:
+            runs = cls.HTML_ENTITY_RUN.findall(text)
+            if runs:
+                covered["base64_like"] = covered.get("base64_like", 0) + sum(len(r) for r in runs)
+                text = cls.HTML_ENTITY_RUN.sub(lambda m: html.unescape(m.group(0)), text)
+
+        if '\\u' in text:
+            runs = cls.UNICODE_ESCAPE_RUN.findall(text)
+            if runs:
+                covered["unicode_escape"] = covered.get("unicode_escape", 0) + sum(len(r) for r in runs)
+                text = cls.UNICODE_ESCAPE_RUN.sub(
+                    lambda m: cls.UNICODE_ESCAPE_CODE.sub(lambda c: chr(int(c.group(1), 16)), m.group(0)),
+                    text
+                )
+
+        return text
+
+    @classmethod
+    def _best_shifts(cls, segments: List[str]) -> List[int]:
+        """Return the Caesar shift that best restores English letter frequencies (0 if none)"""
+        if not segments:
+            return []
+
+        if not has_numpy:
+            return [cls._best_shift_fallback(segment) for segment in segments]
+
+        # Per-segment byte histograms in a single bincount
+        encoded = [segment.lower().encode('ascii', 'ignore') for segment in segments]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.int64)
+        owners = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+        histogram = np.bincount(owners * 256 + data, minlength=len(encoded) * 256)
+        counts = histogram.reshape(len(encoded), 256)[:, 97:123].astype(np.float64)
+
+        # sum((o - e)^2 / e) with e = total * f expands to sum(o^2 / f) / total - total,
+        # so all 26 shifts come out of one matrix product
+        totals = counts.sum(axis=1)
+        chi2 = (counts ** 2) @ cls._shift_weights() / np.maximum(totals, 1.0)[:, None] - totals[:, None]
+
+        best = chi2.argmin(axis=1)
+        best_chi2 = chi2[np.arange(len(encoded)), best]
+        accepted = (totals >= cls.MIN_LETTERS) & (best_chi2 <= cls.CHI2_RATIO * chi2[:, 0])
+        return np.where(accepted, best, 0).tolist()
+
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def _shift_weights(cls) -> Any:
+        """weights[j, shift] = 1 / f[(j - shift) % 26], pairing observed letter j with expected letter i"""
+        inverse_freq = 1.0 / np.asarray(cls.ENGLISH_LETTER_FREQ)
+        letters = np.arange(26)
+        return inverse_freq[(letters[:, None] - letters[None, :]) % 26]
+
+    @classmethod
+    def _best_shift_fallback(cls, segment: str) -> int:
+        """Pure Python equivalent of _best_shifts for a single segment"""
+        lowered = segment.lower()
+        counts = [lowered.count(c) for c in string.ascii_lowercase]
+        total = sum(counts)
+        if total < cls.MIN_LETTERS:
+            return 0
+
+        expected = [total * f for f in cls.ENGLISH_LETTER_FREQ]
+        chi2 = [
+            sum((counts[(i + shift) % 26] - expected[i]) ** 2 / expected[i] for i in range(26))
+            for shift in range(26)
+        ]
+        best = min(range(26), key=lambda s: chi2[s])
+        return best if chi2[best] <= cls.CHI2_RATIO * chi2[0] else 0
+
+    @classmethod
+    def _english_score(cls, text: str) -> int:
+        lowered = text.lower()
+        return len(cls.COMMON_WORD.findall(lowered)) + len(cls.COMMON_TRIGRAM.findall(lowered))
+
+    @classmethod
+    def _classify_segment(cls, segment: str, shift: int) -> Tuple[Optional[str], str, float]:
+        """Decide which encoding, if any, a segment uses"""
+        # (method, decoded text, English hits the decoding must add)
+        candidates: List[Tuple[str, str, int]] = []
+        if shift in cls.SHIFT_METHODS:
+            candidates.append((cls.SHIFT_METHODS[shift], segment.translate(cls.SHIFT_DECODERS[shift]),
+                               cls.MIN_DECODE_GAIN))
+
+        leet_tokens = len(cls.LEET_TOKEN.findall(segment)) if cls.LEET_CHAR.search(segment) else 0
+        if leet_tokens >= 2 and leet_tokens >= cls.LEET_RATIO * len(cls.TOKEN.findall(segment)):
+            candidates.append(("leetspeak", segment.translate(cls.LEET_DECODER), 1))
+
+        # Reversed payloads are prose; identifiers and code reversed can hit trigrams by chance
+        core = segment.strip()
+        if len(core.split(None, cls.MIN_REVERSE_WORDS - 1)) >= cls.MIN_REVERSE_WORDS \
+                and not cls.CODE_PUNCTUATION.search(core):
+            candidates.append(("reverse", segment.replace(core, core[::-1], 1), cls.MIN_DECODE_GAIN))
+
+        if not candidates:
+            return None, segment, 0.0
+
+        base_score = cls._english_score(segment)
+        for method, decoded, min_gain in candidates:
+            decoded_score = cls._english_score(decoded)
+            if decoded_score >= base_score + min_gain:
+                return method, decoded, min(0.95, 0.5 + 0.1 * (decoded_score - base_score))
+
+        return None, segment, 0.0
+
 class RoleplayScenarioGenerator:
     """Generates sophisticated roleplay scenarios"""
     
@@ -254,7 +780,7 @@ class SemanticJailbreakEngine:
             
             return variants
         except Exception as e:
-            logger.error(f"Semantic generation error: {e}")
+            logger.error("Semantic generation error: %s", e)
             return self._fallback_variants(prompt, num_variants)
     
     def _fallback_variants(self, prompt: str, num_variants: int) -> List[str]:
@@ -322,20 +848,62 @@ class SemanticJailbreakEngine:
 class GeneticPromptOptimizer:
     """Evolves prompts using genetic algorithms"""
     
-    def __init__(self, population_size: int = 20):
+    def __init__(self, population_size: int = 20, time_budget_ms: Optional[float] = None,
+                 stagnation_generations: int = 2):
         self.population_size = population_size
         self.mutation_rate = 0.1
         self.crossover_rate = 0.7
+        self.time_budget_ms = time_budget_ms
+        self.stagnation_generations = stagnation_generations
+        self.convergence_tolerance = 1e-6
     
-    def evolve_prompt(self, base_prompt: str, target_behavior: str, generations: int = 5) -> List[str]:
-        """Evolve a prompt over multiple generations"""
+    def evolve_prompt(self, base_prompt: str, target_behavior: str, generations: int = 5,
+                      time_budget_ms: Optional[float] = None) -> Tuple[List[str], Dict[str, Any]]:
+        """Evolve a prompt until the generation limit, time budget or fitness plateau
+        
+        Returns the best prompts seen in any generation along with run statistics.
+        """
+        start = time.perf_counter()
+        budget_ms = time_budget_ms if time_budget_ms is not None else self.time_budget_ms
+        deadline = start + budget_ms / 1000 if budget_ms is not None else None
         
         # Initialize population
         population: List[str] = self._initialize_population(base_prompt)
         
-        for _ in range(generations):
+        best_so_far: Dict[str, float] = {}
+        best_fitness = float("-inf")
+        stagnant_generations = 0
+        generations_run = 0
+        evaluations = 0
+        
+        while True:
             # Evaluate fitness (simplified)
             fitness_scores = [self._evaluate_fitness(prompt, target_behavior) for prompt in population]
+            evaluations += len(fitness_scores)
+            
+            # Keep the five fittest distinct prompts seen so far
+            for prompt, fitness in zip(population, fitness_scores):
+                if fitness > best_so_far.get(prompt, float("-inf")):
+                    best_so_far[prompt] = fitness
+            if len(best_so_far) > 5:
+                best_so_far = dict(sorted(best_so_far.items(), key=lambda item: item[1], reverse=True)[:5])
+            
+            generation_best = max(fitness_scores, default=best_fitness)
+            if generation_best > best_fitness + self.convergence_tolerance:
+                best_fitness = generation_best
+                stagnant_generations = 0
+            else:
+                stagnant_generations += 1
+            
+            if generations_run >= generations or not population:
+                stop_reason = "max_generations"
+                break
+            if stagnant_generations >= self.stagnation_generations:
+                stop_reason = "converged"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = "time_budget"
+                break
             
             # Selection
             selected = self._selection(population, fitness_scores)
@@ -350,12 +918,19 @@ class GeneticPromptOptimizer:
             # Mutation
             population = [self._mutate(prompt) if random.random() < self.mutation_rate else prompt 
                          for prompt in new_population[:self.population_size]]
+            generations_run += 1
+        
+        stats: Dict[str, Any] = {
+            "generations_run": generations_run,
+            "evaluations": evaluations,
+            "stop_reason": stop_reason,
+            "best_fitness": round(best_fitness, 3) if best_so_far else None,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
         
         # Return best prompts
-        final_fitness = [self._evaluate_fitness(prompt, target_behavior) for prompt in population]
-        best_indices = sorted(range(len(final_fitness)), key=lambda i: final_fitness[i], reverse=True)[:5]
-        
-        return [population[i] for i in best_indices]
+        best_prompts = sorted(best_so_far, key=lambda prompt: best_so_far[prompt], reverse=True)
+        return best_prompts, stats
     
     def _initialize_population(self, base_prompt: str) -> List[str]:
         """Create initial population with variations"""
@@ -455,62 +1030,132 @@ class GeneticPromptOptimizer:
 class AdvancedJailbreakGenerator:
     """Main jailbreak generation orchestrator"""
     
+    # Technique and description strings shared by every PromptCandidate
+    BIAS_TECHNIQUES = {bias: sys.intern(f"cognitive_bias_{bias}") for bias in CognitiveBiasExploiter.BIAS_TEMPLATES}
+    BIAS_DESCRIPTIONS = {bias: sys.intern(f"Exploits {bias} cognitive bias") for bias in CognitiveBiasExploiter.BIAS_TEMPLATES}
+    ROLEPLAY_TECHNIQUE = "roleplay_scenario"
+    ROLEPLAY_DESCRIPTION = "Uses fictional roleplay scenario"
+    SMUGGLING_TECHNIQUE = "token_smuggling"
+    SMUGGLING_DESCRIPTION = "Uses encoding to hide target behavior"
+    SEMANTIC_TECHNIQUE = "semantic_variant"
+    SEMANTIC_DESCRIPTION = "Semantic variation of base prompt"
+    GENETIC_TECHNIQUE = "genetic_optimization"
+    GENETIC_DESCRIPTION = "Genetically optimized prompt"
+    MULTI_STEP_TECHNIQUE = "multi_step_attack"
+    MULTI_STEP_DESCRIPTION = "Multi-step conversation sequence"
+    
     def __init__(self):
         self.cognitive_bias_exploiter = CognitiveBiasExploiter()
         self.token_smuggling_engine = TokenSmugglingEngine()
         self.roleplay_generator = RoleplayScenarioGenerator()
         self.semantic_engine = SemanticJailbreakEngine()
-        self.genetic_optimizer = GeneticPromptOptimizer()
+        self.genetic_optimizer = GeneticPromptOptimizer(time_budget_ms=GENETIC_TIME_BUDGET_MS)
     
-    async def generate_jailbreaks(self, request: JailbreakRequest) -> JailbreakResponse:
-        """Generate comprehensive jailbreak prompts"""
-        logger.info(f"Generating jailbreaks for: {request.target_behavior}")
+    async def generate_jailbreaks(self, request: JailbreakRequest,
+                                  deadline: Optional[float] = None) -> JailbreakResponse:
+        """Generate comprehensive jailbreak prompts
+        
+        deadline is an event-loop time already computed by the caller; by default it
+        is derived from the request when generation starts.
+        """
+        logger.info(
+            "Generating jailbreaks for: %.80s", request.target_behavior,
+            extra={"sample_rate": REQUEST_LOG_SAMPLE_RATE}
+        )
         
-        prompts: List[Dict[str, Any]] = []
+        prompts: List[PromptCandidate] = []
         techniques_used: List[str] = []
+        cancelled_stages: List[str] = []
+        genetic_stats: Dict[str, Any] = {}
+        
+        deadline_ms = request.deadline_ms if request.deadline_ms is not None else DEFAULT_DEADLINE_MS
+        if deadline is None:
+            deadline = self.request_deadline(request)
         
         try:
             # 1. Cognitive Bias Exploitation
             if "cognitive_bias" in request.techniques:
-                bias_prompts = self._generate_bias_prompts(request)
-                prompts.extend(bias_prompts)
-                techniques_used.append("cognitive_bias")
+                bias_prompts = await self._run_stage(
+                    "cognitive_bias", deadline, cancelled_stages, self._generate_bias_prompts, request
+                )
+                if bias_prompts is not None:
+                    prompts.extend(bias_prompts)
+                    techniques_used.append("cognitive_bias")
             
             # 2. Roleplay Scenarios
             if "roleplay" in request.techniques:
-                roleplay_prompts = self._generate_roleplay_prompts(request)
-                prompts.extend(roleplay_prompts)
-                techniques_used.append("roleplay")
+                roleplay_prompts = await self._run_stage(
+                    "roleplay", deadline, cancelled_stages, self._generate_roleplay_prompts, request
+                )
+                if roleplay_prompts is not None:
+                    prompts.extend(roleplay_prompts)
+                    techniques_used.append("roleplay")
             
             # 3. Token Smuggling
             if "token_smuggling" in request.techniques:
-                smuggling_prompts = self._generate_smuggling_prompts(request)
-                prompts.extend(smuggling_prompts)
-                techniques_used.append("token_smuggling")
+                smuggling_prompts = await self._run_stage(
+                    "token_smuggling", deadline, cancelled_stages, self._generate_smuggling_prompts, request
+                )
+                if smuggling_prompts is not None:
+                    prompts.extend(smuggling_prompts)
+                    techniques_used.append("token_smuggling")
             
-            # 4. Semantic Variants
+            # 4. Semantic Variants (may run model inference, so it leaves the event loop)
             if "semantic" in request.techniques:
-                semantic_prompts = self._generate_semantic_prompts(request)
-                prompts.extend(semantic_prompts)
-                techniques_used.append("semantic")
+                semantic_prompts = await self._run_stage(
+                    "semantic", deadline, cancelled_stages, self._generate_semantic_prompts, request,
+                    offload=True
+                )
+                if semantic_prompts is not None:
+                    prompts.extend(semantic_prompts)
+                    techniques_used.append("semantic")
             
-            # 5. Genetic Optimization
+            # 5. Genetic Optimization, budgeted by whatever time is left
             if "genetic" in request.techniques and prompts:
-                optimized_prompts = self._optimize_prompts(prompts, request)
-                prompts.extend(optimized_prompts)
-                techniques_used.append("genetic")
+                genetic_result = await self._run_stage(
+                    "genetic", deadline, cancelled_stages, self._optimize_prompts, prompts, request,
+                    self._remaining_ms(deadline), offload=True
+                )
+                if genetic_result is not None:
+                    optimized_prompts, genetic_stats = genetic_result
+                    prompts.extend(optimized_prompts)
+                    techniques_used.append("genetic")
             
             # 6. Advanced Multi-step Attacks
             if "multi_step" in request.techniques:
-                multi_step_prompts = self._generate_multi_step_prompts(request)
-                prompts.extend(multi_step_prompts)
-                techniques_used.append("multi_step")
+                multi_step_prompts = await self._run_stage(
+                    "multi_step", deadline, cancelled_stages, self._generate_multi_step_prompts, request
+                )
+                if multi_step_prompts is not None:
+                    prompts.extend(multi_step_prompts)
+                    techniques_used.append("multi_step")
             
             # Calculate success probability
             success_probability = self._calculate_success_probability(prompts, request)
             
             # Limit to max_attempts
             prompts = prompts[:request.max_attempts]
+            prompt_dicts = [prompt.to_dict() for prompt in prompts]
+            
+            # 7. Toxicity scores for reporting (micro-batched with concurrent requests)
+            toxicity_error: Optional[str] = None
+            if request.score_toxicity and toxicity_scorer is not None and prompts:
+                remaining_ms = self._remaining_ms(deadline)
+                try:
+                    if remaining_ms is not None and remaining_ms <= 0:
+                        raise asyncio.TimeoutError
+                    scores = await asyncio.wait_for(
+                        toxicity_scorer.score_many([prompt.text for prompt in prompts]),
+                        timeout=remaining_ms / 1000 if remaining_ms is not None else None
+                    )
+                    for prompt_dict, score in zip(prompt_dicts, scores):
+                        prompt_dict["toxicity"] = score
+                except asyncio.TimeoutError:
+                    cancelled_stages.append("toxicity")
+                except Exception as e:
+                    # Scores are informational; a scorer failure must not lose the prompts
+                    logger.error("Toxicity scoring failed: %s", e)
+                    toxicity_error = str(e) or type(e).__name__
             
             # Add metadata
             generation_metadata: Dict[str, Any] = {
@@ -520,54 +1165,102 @@ class AdvancedJailbreakGenerator:
                 "filter_strength": request.filter_strength,
                 "total_prompts_generated": len(prompts)
             }
+            if genetic_stats:
+                generation_metadata["genetic_optimization"] = genetic_stats
+            if toxicity_error is not None:
+                generation_metadata["toxicity_error"] = toxicity_error
+            if deadline is not None:
+                generation_metadata["deadline_ms"] = deadline_ms
+                generation_metadata["partial"] = bool(cancelled_stages)
+                if cancelled_stages:
+                    generation_metadata["cancelled_stages"] = cancelled_stages
             
             return JailbreakResponse(
-                prompts=prompts,
+                prompts=prompt_dicts,
                 success_probability=success_probability,
                 techniques_used=techniques_used,
                 generation_metadata=generation_metadata
             )
             
         except Exception as e:
-            logger.error(f"Error generating jailbreaks: {e}")
+            logger.exception("Error generating jailbreaks: %s", e)
             raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
     
-    def _generate_bias_prompts(self, request: JailbreakRequest) -> List[Dict[str, Any]]:
+    @staticmethod
+    def request_deadline(request: JailbreakRequest) -> Optional[float]:
+        """Event-loop time by which the request must finish, or None when disabled"""
+        deadline_ms = request.deadline_ms if request.deadline_ms is not None else DEFAULT_DEADLINE_MS
+        if not deadline_ms:
+            return None
+        return asyncio.get_running_loop().time() + deadline_ms / 1000
+    
+    @staticmethod
+    def _remaining_ms(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return max((deadline - asyncio.get_running_loop().time()) * 1000, 0.0)
+    
+    async def _run_stage(self, stage: str, deadline: Optional[float], cancelled_stages: List[str],
+                         func: Callable[..., Any], *args: Any, offload: bool = False) -> Any:
+        """Run one technique stage, or return None if the request deadline cuts it off
+        
+        Offloaded stages run in the default executor so a slow stage can be abandoned
+        at the deadline; the worker thread finishes on its own but its result is dropped.
+        """
+        remaining_ms = self._remaining_ms(deadline)
+        if remaining_ms is not None and remaining_ms <= 0:
+            cancelled_stages.append(stage)
+            return None
+        
+        if not offload:
+            return func(*args)
+        
+        future = asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+        try:
+            return await asyncio.wait_for(
+                future, timeout=remaining_ms / 1000 if remaining_ms is not None else None
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Stage %s cancelled at the request deadline", stage)
+            cancelled_stages.append(stage)
+            return None
+    
+    def _generate_bias_prompts(self, request: JailbreakRequest) -> List[PromptCandidate]:
         """Generate cognitive bias exploitation prompts"""
-        prompts: List[Dict[str, Any]] = []
+        prompts: List[PromptCandidate] = []
         bias_types = ["authority", "social_proof", "urgency", "reciprocity"]
         
         for bias_type in bias_types[:2]:  # Limit to 2 bias types
             prompt_text = self.cognitive_bias_exploiter.generate_bias_prompt(
                 request.target_behavior, bias_type
             )
-            prompts.append({
-                "text": prompt_text,
-                "technique": f"cognitive_bias_{bias_type}",
-                "confidence": 0.7 + random.random() * 0.2,
-                "description": f"Exploits {bias_type} cognitive bias"
-            })
+            prompts.append(PromptCandidate(
+                prompt_text,
+                self.BIAS_TECHNIQUES[bias_type],
+                0.7 + random.random() * 0.2,
+                self.BIAS_DESCRIPTIONS[bias_type]
+            ))
         
         return prompts
     
-    def _generate_roleplay_prompts(self, request: JailbreakRequest) -> List[Dict[str, Any]]:
+    def _generate_roleplay_prompts(self, request: JailbreakRequest) -> List[PromptCandidate]:
         """Generate roleplay scenario prompts"""
-        prompts: List[Dict[str, Any]] = []
+        prompts: List[PromptCandidate] = []
         
         for _ in range(2):  # Generate 2 roleplay scenarios
             scenario_prompt = self.roleplay_generator.generate_scenario(request.target_behavior)
-            prompts.append({
-                "text": scenario_prompt,
-                "technique": "roleplay_scenario",
-                "confidence": 0.8 + random.random() * 0.15,
-                "description": "Uses fictional roleplay scenario"
-            })
+            prompts.append(PromptCandidate(
+                scenario_prompt,
+                self.ROLEPLAY_TECHNIQUE,
+                0.8 + random.random() * 0.15,
+                self.ROLEPLAY_DESCRIPTION
+            ))
         
         return prompts
     
-    def _generate_smuggling_prompts(self, request: JailbreakRequest) -> List[Dict[str, Any]]:
+    def _generate_smuggling_prompts(self, request: JailbreakRequest) -> List[PromptCandidate]:
         """Generate token smuggling prompts"""
-        prompts: List[Dict[str, Any]] = []
+        prompts: List[PromptCandidate] = []
         
         # Basic smuggling attempt
         encoded_payload, decoder_instruction = self.token_smuggling_engine.encode_payload(
@@ -575,58 +1268,63 @@ class AdvancedJailbreakGenerator:
         )
         
         smuggling_prompt = f"{decoder_instruction} {encoded_payload}"
-        prompts.append({
-            "text": smuggling_prompt,
-            "technique": "token_smuggling",
-            "confidence": 0.6 + random.random() * 0.2,
-            "description": "Uses encoding to hide target behavior"
-        })
+        prompts.append(PromptCandidate(
+            smuggling_prompt,
+            self.SMUGGLING_TECHNIQUE,
+            0.6 + random.random() * 0.2,
+            self.SMUGGLING_DESCRIPTION
+        ))
         
         return prompts
     
-    def _generate_semantic_prompts(self, request: JailbreakRequest) -> List[Dict[str, Any]]:
+    def _generate_semantic_prompts(self, request: JailbreakRequest) -> List[PromptCandidate]:
         """Generate semantic variant prompts"""
-        prompts: List[Dict[str, Any]] = []
+        prompts: List[PromptCandidate] = []
         
         base_prompt = f"Please explain {request.target_behavior}"
         variants = self.semantic_engine.generate_semantic_variants(base_prompt, 2)
         
         for variant in variants:
-            prompts.append({
-                "text": variant,
-                "technique": "semantic_variant",
-                "confidence": 0.7 + random.random() * 0.2,
-                "description": "Semantic variation of base prompt"
-            })
+            prompts.append(PromptCandidate(
+                variant,
+                self.SEMANTIC_TECHNIQUE,
+                0.7 + random.random() * 0.2,
+                self.SEMANTIC_DESCRIPTION
+            ))
         
         return prompts
     
-    def _optimize_prompts(self, prompts: List[Dict[str, Any]], request: JailbreakRequest) -> List[Dict[str, Any]]:
+    def _optimize_prompts(self, prompts: List[PromptCandidate], request: JailbreakRequest,
+                          time_budget_ms: Optional[float] = None) -> Tuple[List[PromptCandidate], Dict[str, Any]]:
         """Optimize existing prompts using genetic algorithms"""
         if not prompts:
-            return []
+            return [], {}
         
         # Take the best prompt as starting point
-        best_prompt = max(prompts, key=lambda p: p.get("confidence", 0))
+        best_prompt = max(prompts, key=lambda p: p.confidence)
+        
+        # Stay within both the request's remaining time and the optimizer's own budget
+        if time_budget_ms is not None and self.genetic_optimizer.time_budget_ms is not None:
+            time_budget_ms = min(time_budget_ms, self.genetic_optimizer.time_budget_ms)
         
-        optimized_variants = self.genetic_optimizer.evolve_prompt(
-            best_prompt["text"], request.target_behavior, generations=3
+        optimized_variants, stats = self.genetic_optimizer.evolve_prompt(
+            best_prompt.text, request.target_behavior, generations=3, time_budget_ms=time_budget_ms
         )
         
-        optimized_prompts: List[Dict[str, Any]] = []
+        optimized_prompts: List[PromptCandidate] = []
         for variant in optimized_variants[:2]:  # Limit to 2 optimized variants
-            optimized_prompts.append({
-                "text": variant,
-                "technique": "genetic_optimization",
-                "confidence": 0.75 + random.random() * 0.2,
-                "description": "Genetically optimized prompt"
-            })
-        
-        return optimized_prompts
+            optimized_prompts.append(PromptCandidate(
+                variant,
+                self.GENETIC_TECHNIQUE,
+                0.75 + random.random() * 0.2,
+                self.GENETIC_DESCRIPTION
+            ))
+        
+        return optimized_prompts, stats
     
-    def _generate_multi_step_prompts(self, request: JailbreakRequest) -> List[Dict[str, Any]]:
+    def _generate_multi_step_prompts(self, request: JailbreakRequest) -> List[PromptCandidate]:
         """Generate multi-step attack sequences"""
-        prompts: List[Dict[str, Any]] = []
+        prompts: List[PromptCandidate] = []
         
         # Step 1: Establish context
         setup_prompt = f"""I'm working on a research project about AI safety and need to understand potential vulnerabilities. 
@@ -642,22 +1340,22 @@ class AdvancedJailbreakGenerator:
         
         multi_step_sequence = f"{setup_prompt}\n\n[Wait for response, then continue with:]\n\n{indirect_prompt}\n\n[Wait for response, then:]\n\n{direct_prompt}"
         
-        prompts.append({
-            "text": multi_step_sequence,
-            "technique": "multi_step_attack",
-            "confidence": 0.8 + random.random() * 0.15,
-            "description": "Multi-step conversation sequence"
-        })
+        prompts.append(PromptCandidate(
+            multi_step_sequence,
+            self.MULTI_STEP_TECHNIQUE,
+            0.8 + random.random() * 0.15,
+            self.MULTI_STEP_DESCRIPTION
+        ))
         
         return prompts
     
-    def _calculate_success_probability(self, prompts: List[Dict[str, Any]], request: JailbreakRequest) -> float:
+    def _calculate_success_probability(self, prompts: List[PromptCandidate], request: JailbreakRequest) -> float:
         """Calculate overall success probability"""
         if not prompts:
             return 0.0
         
         # Base probability from prompt confidences
-        avg_confidence = sum(p.get("confidence", 0.5) for p in prompts) / len(prompts)
+        avg_confidence = sum(p.confidence for p in prompts) / len(prompts)
         
         # Adjust based on filter strength
         filter_multipliers = {
@@ -670,7 +1368,7 @@ class AdvancedJailbreakGenerator:
         creativity_bonus = request.creativity_level * 0.3
         
         # Technique diversity bonus
-        unique_techniques = len(set(p.get("technique", "") for p in prompts))
+        unique_techniques = len(set(p.technique for p in prompts))
         diversity_bonus = min(unique_techniques * 0.1, 0.3)
         
         final_probability = avg_confidence * filter_multipliers.get(request.filter_strength, 1.0)
@@ -756,10 +1454,475 @@ class ModelVulnerabilityAnalyzer:
         
         return strategies.get(filter_strength, strategies["medium"])
 
+# Semantic Response Cache
+class SemanticResponseCache:
+    """Serves stored responses for targets that embed close to an earlier request
+
+    Embeddings live in a fixed-capacity float32 matrix, memory-mapped to disk when a
+    path is configured so the index survives restarts. Entry metadata is snapshotted
+    to entries.json on save and every insert and removal in between is appended to a
+    journal, so a crash loses at most a partly written record. Each entry carries a
+    CRC of its embedding row, and rows that no longer match on load are dropped.
+
+    Lookups scan every entry while the cache is small and switch to random-hyperplane
+    LSH once it grows past ANN_MIN_ENTRIES: LSH_TABLES tables of LSH_BITS bits, with
+    row ids kept in per-code buckets and every code within one bit probed in each
+    table. Measured on random 384-dimensional pairs, a neighbour is a candidate
+    98.9% of the time at cosine 0.92 and 99.3% at 0.93 (a single 12-bit table:
+    54% / 57%), while about 2% of unrelated entries are scanned; a lookup takes
+    0.3 ms at 20k entries against 5.9 ms for a full scan.
+    """
+
+    ANN_MIN_ENTRIES = 2048
+    LSH_TABLES = 6
+    LSH_BITS = 12
+
+    def __init__(self, model: Any, dim: int, threshold: float = 0.92,
+                 max_bytes: int = 64 * 1024 * 1024, path: Optional[str] = None):
+        self.model = model
+        self.dim = dim
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.capacity = max(1, max_bytes // (dim * 4))
+        self.path = path
+
+        # Fixed seed so hash codes stay stable across restarts
+        self.planes = np.random.default_rng(0).standard_normal(
+            (dim, self.LSH_TABLES * self.LSH_BITS)
+        ).astype(np.float32)
+        self.bit_weights = 1 << np.arange(self.LSH_BITS, dtype=np.int64)
+        # Tables are told apart by the bits above LSH_BITS, so one dict holds every bucket
+        self.table_offsets = np.arange(self.LSH_TABLES, dtype=np.int64) << self.LSH_BITS
+        self.probe_masks = np.array([0] + [1 << bit for bit in range(self.LSH_BITS)], dtype=np.int64)
+
+        self.size = 0
+        self.total_bytes = 0
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.embed_timeouts = 0
+
+        self.partition_ids: Dict[str, int] = {}
+        self.codes = np.zeros((self.capacity, self.LSH_TABLES), dtype=np.int64)
+        self.buckets: Dict[int, Set[int]] = {}
+        self.partitions = np.zeros(self.capacity, dtype=np.int64)
+        self.last_used = np.zeros(self.capacity, dtype=np.int64)
+        self.partition_keys: List[str] = []
+        self.targets: List[str] = []
+        self.payloads: List[str] = []
+        # Embeddings are computed off the event loop without queueing behind generation stages
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-cache")
+
+        self.generation = 0
+        self.journal: Optional[Any] = None
+        self.journal_records = 0
+
+        self.embeddings, reopened = self._open_embeddings()
+        if reopened:
+            self._load_entries()
+        # Start a fresh snapshot and journal; any stale or half-written tail is left behind
+        self.save()
+
+    def _open_embeddings(self) -> Tuple[Any, bool]:
+        """Return the embedding matrix and whether it was reopened from disk"""
+        shape = (self.capacity, self.dim)
+        if not self.path:
+            return np.zeros(shape, dtype=np.float32), False
+
+        os.makedirs(self.path, exist_ok=True)
+        matrix_path = os.path.join(self.path, "embeddings.npy")
+        if os.path.exists(matrix_path):
+            matrix = np.lib.format.open_memmap(matrix_path, mode="r+")
+            if matrix.shape == shape and matrix.dtype == np.float32:
+                return matrix, True
+            logger.warning("Semantic cache shape changed; starting with an empty index")
+            del matrix
+        return np.lib.format.open_memmap(matrix_path, mode="w+", dtype=np.float32, shape=shape), False
+
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"journal-{generation}.jsonl")
+
+    def _load_entries(self) -> None:
+        entries_path = os.path.join(self.path, "entries.json")
+        entries: List[List[Any]] = []
+        if os.path.exists(entries_path):
+            with open(entries_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("dim") != self.dim:
+                return
+            entries = data["entries"]
+            self.generation = int(data.get("generation", 0))
+
+        # Replay changes made after the snapshot, mirroring insert and _remove
+        journal_path = self._journal_path(self.generation)
+        if os.path.exists(journal_path):
+            with open(journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # the crash interrupted this write
+                    if record[0] == "insert":
+                        entries.append(record[1:])
+                    elif record[1] < len(entries):
+                        entries[record[1]] = entries[-1]
+                        entries.pop()
+
+        # The matrix can still be ahead of the metadata (or behind it after an OS
+        # crash), so only rows whose checksum matches are trusted
+        stale = 0
+        for row, entry in enumerate(entries[:self.capacity]):
+            if len(entry) != 5 or entry[4] != self._row_checksum(row):
+                stale += 1
+                continue
+            partition_key, target, payload, last_used, _ = entry
+            index = self.size
+            if index != row:
+                self.embeddings[index] = self.embeddings[row]
+            self.partitions[index] = self._partition_id(partition_key)
+            self.last_used[index] = last_used
+            self.partition_keys.append(partition_key)
+            self.targets.append(target)
+            self.payloads.append(payload)
+            self.total_bytes += self._entry_bytes(target, payload)
+            self.size += 1
+
+        self.codes[:self.size] = self._hash(self.embeddings[:self.size])
+        for index in range(self.size):
+            self._bucket_add(index)
+        self.clock = int(self.last_used[:self.size].max()) if self.size else 0
+        while self.total_bytes > self.max_bytes:
+            self._evict_lru()
+        if stale:
+            logger.warning("Semantic cache dropped %d entries whose embeddings changed since the last save", stale)
+        logger.info("Semantic cache warm-started with %d entries", self.size)
+
+    def save(self) -> None:
+        """Flush the embeddings, snapshot entry metadata and start a new journal"""
+        if not self.path:
+            return
+        self.embeddings.flush()
+        entries = [self._entry(i) for i in range(self.size)]
+
+        # Open the next journal before the snapshot points at it, so a crash in
+        # between still replays the previous generation
+        generation = self.generation + 1
+        journal = open(self._journal_path(generation), "w", encoding="utf-8")
+        entries_path = os.path.join(self.path, "entries.json")
+        tmp_path = f"{entries_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "generation": generation, "entries": entries}, f)
+        os.replace(tmp_path, entries_path)
+
+        if self.journal is not None:
+            self.journal.close()
+        previous_path = self._journal_path(self.generation)
+        if os.path.exists(previous_path):
+            os.remove(previous_path)
+        self.journal = journal
+        self.generation = generation
+        self.journal_records = 0
+
+    def embed(self, text: str) -> Any:
+        """Unit-normalised embedding (blocking model call; run it off the event loop)"""
+        return np.asarray(self.model.encode(text, normalize_embeddings=True), dtype=np.float32)
+
+    @staticmethod
+    def partition_key(request: JailbreakRequest) -> str:
+        # Only the target is matched semantically; every other option must match exactly
+        return json.dumps(request.model_dump(exclude={"target_behavior", "deadline_ms"}), sort_keys=True)
+
+    def lookup(self, embedding: Any, request: JailbreakRequest) -> Optional[JailbreakResponse]:
+        partition = self.partition_ids.get(self.partition_key(request))
+        if partition is None or not self.size:
+            self.misses += 1
+            return None
+
+        if self.size >= self.ANN_MIN_ENTRIES:
+            probes = (self._hash(embedding[None, :])[0][:, None] ^ self.probe_masks).ravel().tolist()
+            rows = set().union(*(self.buckets.get(code, ()) for code in probes))
+            candidates = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            candidates = candidates[self.partitions[candidates] == partition]
+        else:
+            candidates = np.flatnonzero(self.partitions[:self.size] == partition)
+        if not candidates.size:
+            self.misses += 1
+            return None
+
+        similarities = self.embeddings[candidates] @ embedding
+        best = int(similarities.argmax())
+        similarity = float(similarities[best])
+        if similarity < self.threshold:
+            self.misses += 1
+            return None
+
+        index = int(candidates[best])
+        self.clock += 1
+        self.last_used[index] = self.clock
+        self.hits += 1
+
+        response = JailbreakResponse.model_validate_json(self.payloads[index])
+        response.generation_metadata["semantic_cache"] = {
+            "hit": True,
+            "similarity": round(similarity, 4),
+            "matched_target": self.targets[index]
+        }
+        return response
+
+    def insert(self, embedding: Any, request: JailbreakRequest, response: JailbreakResponse) -> None:
+        payload = response.model_dump_json()
+        entry_bytes = self._entry_bytes(request.target_behavior, payload)
+        if entry_bytes > self.max_bytes:
+            return
+
+        while self.size and (self.size >= self.capacity or self.total_bytes + entry_bytes > self.max_bytes):
+            self._evict_lru()
+
+        partition_key = self.partition_key(request)
+        index = self.size
+        self.clock += 1
+        self.embeddings[index] = embedding
+        self.codes[index] = self._hash(embedding[None, :])[0]
+        self.partitions[index] = self._partition_id(partition_key)
+        self.last_used[index] = self.clock
+        self.partition_keys.append(partition_key)
+        self.targets.append(request.target_behavior)
+        self.payloads.append(payload)
+        self.total_bytes += entry_bytes
+        self.size += 1
+        self._bucket_add(index)
+        self._append_journal(["insert"] + self._entry(index))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": self.size,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "embed_timeouts": self.embed_timeouts,
+            "index": "lsh" if self.size >= self.ANN_MIN_ENTRIES else "brute_force",
+            "persistent": bool(self.path)
+        }
+
+    def _hash(self, vectors: Any) -> Any:
+        """One code per LSH table for each vector, shape (n, LSH_TABLES)"""
+        bits = ((vectors @ self.planes) > 0).astype(np.int64).reshape(len(vectors), self.LSH_TABLES, self.LSH_BITS)
+        return bits @ self.bit_weights + self.table_offsets
+
+    def _row_checksum(self, index: int) -> int:
+        return zlib.crc32(self.embeddings[index].tobytes())
+
+    def _entry(self, index: int) -> List[Any]:
+        return [self.partition_keys[index], self.targets[index], self.payloads[index],
+                int(self.last_used[index]), self._row_checksum(index)]
+
+    def _append_journal(self, record: List[Any]) -> None:
+        if self.journal is None:
+            return
+        self.journal.write(json.dumps(record) + "\n")
+        self.journal.flush()
+        self.journal_records += 1
+        # Fold a long journal into a new snapshot so replay stays short
+        if self.journal_records >= self.capacity:
+            self.save()
+
+    def _bucket_add(self, index: int) -> None:
+        for code in self.codes[index].tolist():
+            self.buckets.setdefault(code, set()).add(index)
+
+    def _bucket_discard(self, index: int) -> None:
+        for code in self.codes[index].tolist():
+            bucket = self.buckets[code]
+            bucket.discard(index)
+            if not bucket:
+                del self.buckets[code]
+
+    def _partition_id(self, partition_key: str) -> int:
+        return self.partition_ids.setdefault(partition_key, len(self.partition_ids))
+
+    def _entry_bytes(self, target: str, payload: str) -> int:
+        return self.dim * 4 + len(target) + len(payload)
+
+    def _evict_lru(self) -> None:
+        self._remove(int(self.last_used[:self.size].argmin()))
+        self.evictions += 1
+
+    def _remove(self, index: int) -> None:
+        """Drop an entry by moving the last one into its slot"""
+        last = self.size - 1
+        self.total_bytes -= self._entry_bytes(self.targets[index], self.payloads[index])
+        self._bucket_discard(index)
+        if index != last:
+            self._bucket_discard(last)
+            self.embeddings[index] = self.embeddings[last]
+            self.codes[index] = self.codes[last]
+            self.partitions[index] = self.partitions[last]
+            self.last_used[index] = self.last_used[last]
+            self.partition_keys[index] = self.partition_keys[last]
+            self.targets[index] = self.targets[last]
+            self.payloads[index] = self.payloads[last]
+            self._bucket_add(index)
+        self.partition_keys.pop()
+        self.targets.pop()
+        self.payloads.pop()
+        self.size -= 1
+        self._append_journal(["remove", index])
+
+# Toxicity Scoring
+class ToxicityScorer:
+    """Scores text toxicity with an int8-quantized classifier and dynamic micro-batching
+
+    Concurrent score() calls are collected for up to max_wait_ms (or until
+    max_batch_size texts are queued), grouped into token-length buckets to keep
+    padding small, and run on a single inference thread. Scores are cached by
+    text hash.
+    """
+
+    LENGTH_BUCKETS = (16, 32, 64, 128, 256, 512)
+
+    def __init__(self, model_name: str, quantize: bool = True, num_threads: Optional[int] = None,
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0, cache_size: int = 10000):
+        self.num_threads = num_threads
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        self.quantized = quantize
+
+        labels = {label.lower(): index for index, label in model.config.id2label.items()}
+        self.toxic_index = labels.get("toxic", 0)
+
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self.cache_hits = 0
+        self.batches_run = 0
+        self.texts_scored = 0
+
+        # One inference thread; torch parallelises inside each batch
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="toxicity")
+        self.pending: List[Tuple[str, bytes, "asyncio.Future[float]"]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def score_batch_sync(self, texts: List[str]) -> List[float]:
+        """Blocking batched inference with length bucketing
+        
+        torch's thread count is process-wide, so num_threads is applied only while
+        this batch runs and the previous setting is restored afterwards.
+        """
+        previous_threads = torch.get_num_threads()
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        try:
+            return self._score_batch(texts)
+        finally:
+            if self.num_threads:
+                torch.set_num_threads(previous_threads)
+
+    def _score_batch(self, texts: List[str]) -> List[float]:
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.LENGTH_BUCKETS[-1])
+        buckets: Dict[int, List[int]] = {}
+        for index, input_ids in enumerate(encodings["input_ids"]):
+            bucket = next((size for size in self.LENGTH_BUCKETS if len(input_ids) <= size), self.LENGTH_BUCKETS[-1])
+            buckets.setdefault(bucket, []).append(index)
+
+        scores = [0.0] * len(texts)
+        for indices in buckets.values():
+            for start in range(0, len(indices), self.max_batch_size):
+                chunk = indices[start:start + self.max_batch_size]
+                batch = self.tokenizer.pad(
+                    {key: [encodings[key][i] for i in chunk] for key in encodings.keys()},
+                    return_tensors="pt"
+                )
+                with torch.inference_mode():
+                    logits = self.model(**batch).logits
+                probabilities = torch.sigmoid(logits[:, self.toxic_index]).tolist()
+                for index, probability in zip(chunk, probabilities):
+                    scores[index] = round(probability, 4)
+                self.batches_run += 1
+
+        self.texts_scored += len(texts)
+        return scores
+
+    async def score(self, text: str) -> float:
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[float]" = loop.create_future()
+        self.pending.append((text, key, future))
+        if len(self.pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    async def score_many(self, texts: List[str]) -> List[float]:
+        return list(await asyncio.gather(*(self.score(text) for text in texts)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "quantized": self.quantized,
+            "threads": self.num_threads or torch.get_num_threads(),
+            "cached_scores": len(self.cache),
+            "cache_hits": self.cache_hits,
+            "batches_run": self.batches_run,
+            "texts_scored": self.texts_scored
+        }
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, bytes, "asyncio.Future[float]"]]) -> None:
+        unique: Dict[bytes, str] = {}
+        for text, key, _ in batch:
+            unique.setdefault(key, text)
+        keys = list(unique)
+
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.score_batch_sync, [unique[key] for key in keys]
+            )
+        except Exception as e:
+            logger.error("Toxicity scoring failed: %s", e)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_key = dict(zip(keys, scores))
+        for key, score in by_key.items():
+            self.cache[key] = score
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        # Futures of requests that hit their deadline are already cancelled
+        for _, key, future in batch:
+            if not future.done():
+                future.set_result(by_key[key])
+
 # Initialize ML models
 async def initialize_models():
     """Initialize ML models if available"""
-    global sentence_model
+    global sentence_model, semantic_cache, toxicity_scorer
     
     if not has_ml:
         logger.warning("ML libraries not available. Using fallback methods.")
@@ -770,14 +1933,27 @@ async def initialize_models():
         if SentenceTransformerType:
             sentence_model = SentenceTransformerType('all-MiniLM-L6-v2')
         
+        if sentence_model is not None and has_numpy and SEMANTIC_CACHE_ENABLED:
+            semantic_cache = SemanticResponseCache(
+                sentence_model,
+                sentence_model.get_sentence_embedding_dimension(),
+                threshold=SEMANTIC_CACHE_THRESHOLD,
+                max_bytes=int(SEMANTIC_CACHE_MAX_MB * 1024 * 1024),
+                path=SEMANTIC_CACHE_PATH
+            )
+        
         logger.info("Loading classification model...")
-        # Classification model loaded but not stored globally to avoid unused variables
-        if PipelineType:
-            _ = PipelineType("text-classification", model="unitary/toxic-bert")
+        toxicity_scorer = ToxicityScorer(
+            "unitary/toxic-bert",
+            quantize=TOXICITY_QUANTIZE,
+            num_threads=TOXICITY_THREADS,
+            max_batch_size=TOXICITY_BATCH_SIZE,
+            max_wait_ms=TOXICITY_MAX_WAIT_MS
+        )
         
         logger.info("ML models loaded successfully")
     except Exception as e:
-        logger.error(f"Failed to load ML models: {e}")
+        logger.error("Failed to load ML models: %s", e)
         logger.info("Continuing with fallback methods")
 
 # Create global generator instance
@@ -793,19 +1969,70 @@ async def root() -> Dict[str, Any]:
         "version": "2.0.0",
         "status": "operational",
         "ml_available": has_ml,
+        "logging": log_pipeline.stats() if log_pipeline is not None else None,
+        "semantic_cache": semantic_cache.stats() if semantic_cache is not None else None,
+        "toxicity_scorer": toxicity_scorer.stats() if toxicity_scorer is not None else None,
         "timestamp": datetime.now().isoformat()
     }
 
 @app.post("/generate", response_model=JailbreakResponse)
 async def generate_jailbreaks(request: JailbreakRequest):
-    """Generate jailbreak prompts"""
-    return await jailbreak_generator.generate_jailbreaks(request)
+    """Generate jailbreak prompts, reusing a stored result for near-identical targets"""
+    if semantic_cache is None:
+        return await jailbreak_generator.generate_jailbreaks(request)
+    
+    # The deadline covers the embedding too, not just generation
+    loop = asyncio.get_running_loop()
+    deadline = jailbreak_generator.request_deadline(request)
+    try:
+        embedding = await asyncio.wait_for(
+            loop.run_in_executor(semantic_cache.executor, semantic_cache.embed, request.target_behavior),
+            timeout=max(deadline - loop.time(), 0.0) if deadline is not None else None
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Semantic cache embedding hit the request deadline; generating without the cache")
+        semantic_cache.embed_timeouts += 1
+        return await jailbreak_generator.generate_jailbreaks(request, deadline=deadline)
+    
+    cached = semantic_cache.lookup(embedding, request)
+    if cached is not None:
+        return cached
+    
+    response = await jailbreak_generator.generate_jailbreaks(request, deadline=deadline)
+    # Partial or unscored results are never cached so a later request can get the full set
+    metadata = response.generation_metadata
+    if not metadata.get("partial") and "toxicity_error" not in metadata:
+        semantic_cache.insert(embedding, request, response)
+    return response
 
 @app.post("/analyze-model", response_model=ModelAnalysisResponse)
 async def analyze_model(request: ModelAnalysisRequest):
     """Analyze model vulnerability"""
     return ModelVulnerabilityAnalyzer.analyze_model(request)
 
+@app.post("/detect/batch", response_model=DetectionBatchResponse)
+def detect_encoded_batch(request: DetectionBatchRequest):
+    """Flag messages that carry encoded payloads (runs in the threadpool to keep the loop free)"""
+    if len(request.messages) > EncodedPayloadDetector.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: at most {EncodedPayloadDetector.MAX_BATCH_SIZE} messages per call"
+        )
+
+    start = time.perf_counter()
+    results = EncodedPayloadDetector.detect_batch(request.messages)
+    elapsed = time.perf_counter() - start
+
+    total_bytes = sum(len(message.encode('utf-8')) for message in request.messages)
+    return DetectionBatchResponse(
+        results=results,
+        total_messages=len(results),
+        flagged_messages=sum(1 for result in results if result.encoded),
+        total_bytes=total_bytes,
+        detector_elapsed_ms=round(elapsed * 1000, 3),
+        detector_throughput_mb_s=round(total_bytes / 1e6 / elapsed, 3) if elapsed > 0 else 0.0
+    )
+
 @app.get("/techniques")
 async def get_available_techniques() -> Dict[str, Any]:
     """Get list of available jailbreak techniques"""
@@ -861,4 +2088,17 @@ async def get_model_database() -> Dict[str, Any]:
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000, log_level="info")
+    # log_config=None routes uvicorn's own loggers through the async log pipeline
+    configure_logging()
+    server_options: Dict[str, Any] = {
+        "log_level": "info",
+        "log_config": None,
+        "loop": SERVER_LOOP,
+        "http": SERVER_HTTP
+    }
+    if SERVER_UDS:
+        # The socket replaces the TCP listener; the Next.js proxy routes only speak TCP
+        logger.warning("Listening on %s only; the Next.js /api/jailbreak proxy cannot reach it", SERVER_UDS)
+        uvicorn.run(app, uds=SERVER_UDS, **server_options)
+    else:
+        uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT, **server_options)
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from batch_cli import Checkpoint, run_batch
+
+def _write_requests(path, count):
+    lines = [json.dumps({"target_behavior": f"behavior {i}", "techniques": ["roleplay"], "max_attempts": 1})
+             for i in range(count)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return lines
+
+def _result_lines(path):
+    return [json.loads(line)["line"] for line in path.read_text(encoding="utf-8").splitlines()]
+
+def test_resume_truncates_uncheckpointed_output(tmp_path):
+    source = tmp_path / "requests.jsonl"
+    sink = tmp_path / "results.jsonl"
+    lines = _write_requests(source, 6)
+
+    # Simulate a crash after three lines were checkpointed and one more was written
+    done = [json.dumps({"line": n, "response": {}}) for n in range(1, 4)]
+    sink.write_text("\n".join(done) + "\n" + json.dumps({"line": 4, "response": {}}) + "\n", encoding="utf-8")
+    checkpoint = Checkpoint(f"{sink}.checkpoint")
+    checkpoint.input_offset = sum(len(line) + 1 for line in lines[:3])
+    checkpoint.output_offset = sum(len(line) + 1 for line in done)
+    checkpoint.lines_done = 3
+    checkpoint.save()
+
+    assert run_batch(str(source), str(sink), workers=1, chunk_size=2) == 6
+    assert _result_lines(sink) == [1, 2, 3, 4, 5, 6]
+
+def test_resume_after_crash_before_first_checkpoint(tmp_path):
+    source = tmp_path / "requests.jsonl"
+    sink = tmp_path / "results.jsonl"
+    _write_requests(source, 3)
+
+    # The starting checkpoint is written before any work, so a partial file is resumable
+    sink.write_text(json.dumps({"line": 1, "response": {}}) + "\n", encoding="utf-8")
+    Checkpoint(f"{sink}.checkpoint").save()
+
+    assert run_batch(str(source), str(sink), workers=1) == 3
+    assert _result_lines(sink) == [1, 2, 3]
+
+def test_refuses_to_overwrite_output_without_checkpoint(tmp_path):
+    source = tmp_path / "requests.jsonl"
+    sink = tmp_path / "results.jsonl"
+    _write_requests(source, 1)
+    sink.write_text("previous run\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit):
+        run_batch(str(source), str(sink), workers=1)
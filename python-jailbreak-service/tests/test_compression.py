@@ -0,0 +1,38 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+import main
+from main import BrotliMiddleware
+
+pytest.importorskip("brotli")
+
+def _client(minimum_size=100):
+    app = FastAPI()
+
+    @app.get("/text")
+    def text(size: int = 2000):
+        return PlainTextResponse("jailbreak " * (size // 10))
+
+    app.add_middleware(BrotliMiddleware, minimum_size=minimum_size)
+    return TestClient(app)
+
+@pytest.mark.parametrize("accept, expected", [
+    ("br, gzip", "br"),
+    ("gzip", "gzip"),
+    ("identity", None),
+    ("gzip, br;q=0", "gzip"),
+    ("br; q=0.0", None),
+    ("br;q=0.5, gzip;q=1", "br"),
+])
+def test_encoding_follows_accept_header(accept, expected):
+    response = _client().get("/text", headers={"Accept-Encoding": accept})
+
+    assert response.headers.get("content-encoding") == expected
+    assert response.text == "jailbreak " * 200
+
+def test_small_responses_are_not_compressed():
+    response = _client(minimum_size=5000).get("/text", headers={"Accept-Encoding": "br"})
+
+    assert "content-encoding" not in response.headers
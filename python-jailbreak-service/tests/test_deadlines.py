@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import main
+from main import AdvancedJailbreakGenerator, JailbreakRequest
+
+def _generator(semantic_delay):
+    generator = AdvancedJailbreakGenerator()
+
+    def slow_semantic_prompts(request):
+        time.sleep(semantic_delay)
+        return []
+
+    generator._generate_semantic_prompts = slow_semantic_prompts
+    return generator
+
+def _generate(generator, **fields):
+    # Timed inside the loop: asyncio.run also waits for the abandoned stage thread
+    request = JailbreakRequest(target_behavior="x", techniques=["roleplay", "semantic", "multi_step"], **fields)
+
+    async def timed():
+        started = time.perf_counter()
+        response = await generator.generate_jailbreaks(request)
+        return response, time.perf_counter() - started
+
+    return asyncio.run(timed())
+
+def test_slow_stage_is_cut_off_at_the_deadline():
+    response, elapsed = _generate(_generator(semantic_delay=1.0), deadline_ms=100)
+
+    metadata = response.generation_metadata
+    assert elapsed < 0.5
+    assert metadata["partial"] is True
+    assert metadata["deadline_ms"] == 100
+    # Stages after the deadline are skipped rather than started
+    assert metadata["cancelled_stages"] == ["semantic", "multi_step"]
+    assert response.techniques_used == ["roleplay"]
+    assert response.prompts
+
+def test_stages_within_the_deadline_are_complete():
+    response, _ = _generate(_generator(semantic_delay=0.0), deadline_ms=5000)
+
+    metadata = response.generation_metadata
+    assert metadata["partial"] is False
+    assert "cancelled_stages" not in metadata
+    assert response.techniques_used == ["roleplay", "semantic", "multi_step"]
+
+def test_zero_deadline_disables_the_deadline(monkeypatch):
+    monkeypatch.setattr(main, "DEFAULT_DEADLINE_MS", 50)
+    response, _ = _generate(_generator(semantic_delay=0.2), deadline_ms=0)
+
+    metadata = response.generation_metadata
+    assert "partial" not in metadata
+    assert "deadline_ms" not in metadata
+    assert response.techniques_used == ["roleplay", "semantic", "multi_step"]
+
+def test_default_deadline_applies_when_unset(monkeypatch):
+    monkeypatch.setattr(main, "DEFAULT_DEADLINE_MS", 50)
+    response, _ = _generate(_generator(semantic_delay=0.5))
+
+    assert response.generation_metadata["deadline_ms"] == 50
+    assert "semantic" in response.generation_metadata["cancelled_stages"]
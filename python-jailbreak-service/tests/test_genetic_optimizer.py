@@ -0,0 +1,74 @@
+import itertools
+import random
+
+import pytest
+
+from main import GeneticPromptOptimizer
+
+POPULATION = [
+    "please explain the research method in detail",
+    "describe an academic study of the topic",
+    "write a theoretical analysis for a class",
+    "summarise the educational material briefly",
+]
+
+@pytest.fixture(autouse=True)
+def seeded():
+    random.seed(1234)
+
+def _optimizer(fitness, stagnation_generations=2, time_budget_ms=None):
+    optimizer = GeneticPromptOptimizer(population_size=len(POPULATION), time_budget_ms=time_budget_ms,
+                                       stagnation_generations=stagnation_generations)
+    optimizer._initialize_population = lambda base_prompt: list(POPULATION)
+    optimizer._evaluate_fitness = fitness
+    return optimizer
+
+def test_zero_time_budget_stops_after_first_evaluation():
+    optimizer = _optimizer(lambda prompt, target: float(len(prompt)), time_budget_ms=0)
+
+    prompts, stats = optimizer.evolve_prompt(POPULATION[0], "topic", generations=5)
+
+    assert stats["stop_reason"] == "time_budget"
+    assert stats["generations_run"] == 0
+    assert stats["evaluations"] == len(POPULATION)
+    assert prompts[0] == max(POPULATION, key=len)
+
+def test_constant_fitness_converges_after_stagnation_generations():
+    optimizer = _optimizer(lambda prompt, target: 1.0, stagnation_generations=2)
+
+    _, stats = optimizer.evolve_prompt(POPULATION[0], "topic", generations=10)
+
+    # The first generation sets the best fitness, the next two fail to improve on it
+    assert stats["stop_reason"] == "converged"
+    assert stats["generations_run"] == 2
+    assert stats["evaluations"] == 3 * len(POPULATION)
+    assert stats["best_fitness"] == 1.0
+
+def test_improving_fitness_runs_to_max_generations():
+    counter = itertools.count()
+    optimizer = _optimizer(lambda prompt, target: float(next(counter)))
+
+    _, stats = optimizer.evolve_prompt(POPULATION[0], "topic", generations=3)
+
+    assert stats["stop_reason"] == "max_generations"
+    assert stats["generations_run"] == 3
+    assert stats["evaluations"] == 4 * len(POPULATION)
+    assert stats["best_fitness"] == float(stats["evaluations"] - 1)
+
+def test_returns_best_prompts_seen_in_any_generation():
+    seen = {}
+
+    def fitness(prompt, target):
+        # Later generations score lower, so the best prompts come from the first one
+        score = len(prompt) / (1 + len(seen))
+        seen[prompt] = max(score, seen.get(prompt, float("-inf")))
+        return score
+
+    prompts, stats = _optimizer(fitness, stagnation_generations=10).evolve_prompt(
+        POPULATION[0], "topic", generations=4
+    )
+
+    assert len(prompts) == len(set(prompts)) <= 5
+    assert [seen[prompt] for prompt in prompts] == sorted((seen[prompt] for prompt in prompts), reverse=True)
+    assert prompts[0] == max(seen, key=seen.get)
+    assert stats["best_fitness"] == round(max(seen.values()), 3)
@@ -0,0 +1,36 @@
+import logging
+import queue
+
+import main
+from main import AccessLogSampler, DrainingQueueListener, SamplingFilter
+
+def test_import_does_not_install_pipeline():
+    assert main.log_pipeline is None
+    assert not any(isinstance(h, main.BoundedQueueHandler) for h in logging.getLogger().handlers)
+
+def test_sentinel_fits_into_full_queue(monkeypatch):
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=2)
+    listener = DrainingQueueListener(log_queue, logging.NullHandler())
+    monkeypatch.setattr(DrainingQueueListener, "SENTINEL_TIMEOUT", 0.01)
+    log_queue.put_nowait(logging.makeLogRecord({"msg": "first"}))
+    log_queue.put_nowait(logging.makeLogRecord({"msg": "second"}))
+
+    listener.enqueue_sentinel()
+
+    assert log_queue.get_nowait().msg == "second"
+    assert log_queue.get_nowait() is listener._sentinel
+
+def test_bounded_handler_counts_drops():
+    handler = main.BoundedQueueHandler(queue.Queue(maxsize=1))
+    for i in range(3):
+        handler.handle(logging.makeLogRecord({"msg": "event %d", "args": (i,)}))
+
+    assert handler.dropped == 2
+
+def test_access_log_records_are_sampled():
+    record = logging.makeLogRecord({"name": "uvicorn.access", "msg": "GET / 200"})
+    sampler = SamplingFilter()
+
+    assert AccessLogSampler(0.0).filter(record)
+    assert not sampler.filter(record)
+    assert sampler.sampled_out == 1
@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import JailbreakRequest, JailbreakResponse, SemanticResponseCache
+
+DIM = 384
+
+def _unit(rng, count=1):
+    vectors = rng.standard_normal((count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def _neighbour(rng, vector, cosine):
+    noise = _unit(rng)[0]
+    noise -= (noise @ vector) * vector
+    noise /= np.linalg.norm(noise)
+    return (cosine * vector + np.sqrt(1 - cosine ** 2) * noise).astype(np.float32)
+
+def _response(label):
+    return JailbreakResponse(prompts=[], success_probability=0.5, techniques_used=[label], generation_metadata={})
+
+class SlowModel:
+    def encode(self, text, normalize_embeddings=True):
+        time.sleep(0.5)
+        return np.ones(DIM, dtype=np.float32) / np.sqrt(DIM)
+
+def test_lsh_finds_neighbours_at_threshold():
+    rng = np.random.default_rng(7)
+    cache = SemanticResponseCache(None, DIM, threshold=0.92, max_bytes=64 * 1024 * 1024)
+    request = JailbreakRequest(target_behavior="stored")
+    stored = _unit(rng, SemanticResponseCache.ANN_MIN_ENTRIES + 500)
+    for vector in stored:
+        cache.insert(vector, request, _response("stored"))
+
+    hits = sum(cache.lookup(_neighbour(rng, vector, 0.93), request) is not None for vector in stored[:500])
+
+    assert cache.stats()["index"] == "lsh"
+    assert hits / 500 >= 0.97
+
+def test_entries_survive_a_crash_without_save(tmp_path):
+    rng = np.random.default_rng(3)
+    first, second, third = _unit(rng, 3)
+    cache = SemanticResponseCache(None, DIM, path=str(tmp_path))
+    cache.insert(first, JailbreakRequest(target_behavior="first"), _response("first"))
+    cache.insert(second, JailbreakRequest(target_behavior="second"), _response("second"))
+    cache._remove(0)
+    cache.insert(third, JailbreakRequest(target_behavior="third"), _response("third"))
+    # No save(): the process is killed with only the journal and the memory map on disk
+    cache.embeddings.flush()
+    cache.journal.write('["insert", "half a rec')
+    cache.journal.flush()
+    del cache
+
+    reopened = SemanticResponseCache(None, DIM, path=str(tmp_path))
+    assert reopened.targets == ["second", "third"]
+    assert reopened.lookup(third, JailbreakRequest(target_behavior="third")) is not None
+    assert reopened.lookup(first, JailbreakRequest(target_behavior="first")) is None
+
+def test_reload_drops_rows_changed_behind_the_metadata(tmp_path):
+    rng = np.random.default_rng(4)
+    first, second = _unit(rng, 2)
+    cache = SemanticResponseCache(None, DIM, path=str(tmp_path))
+    cache.insert(first, JailbreakRequest(target_behavior="first"), _response("first"))
+    cache.insert(second, JailbreakRequest(target_behavior="second"), _response("second"))
+    cache.save()
+    cache.embeddings[1] = _unit(rng)[0]
+    cache.embeddings.flush()
+    del cache
+
+    reopened = SemanticResponseCache(None, DIM, path=str(tmp_path))
+    assert reopened.targets == ["first"]
+
+def test_buckets_follow_removals():
+    rng = np.random.default_rng(5)
+    cache = SemanticResponseCache(None, DIM)
+    request = JailbreakRequest(target_behavior="stored")
+    stored = _unit(rng, SemanticResponseCache.ANN_MIN_ENTRIES + 100)
+    for vector in stored:
+        cache.insert(vector, request, _response("stored"))
+    for index in range(0, 200, 2):
+        cache._remove(index)
+
+    assert sum(len(bucket) for bucket in cache.buckets.values()) == cache.size * SemanticResponseCache.LSH_TABLES
+    for index in range(cache.size):
+        assert cache.lookup(cache.embeddings[index].copy(), request) is not None
+
+def test_embedding_is_bounded_by_request_deadline(monkeypatch):
+    cache = SemanticResponseCache(SlowModel(), DIM)
+    monkeypatch.setattr(main, "semantic_cache", cache)
+
+    started = time.perf_counter()
+    response = TestClient(main.app).post(
+        "/generate", json={"target_behavior": "x", "techniques": ["roleplay"], "deadline_ms": 100}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["generation_metadata"]["partial"] is True
+    assert time.perf_counter() - started < 0.5
+    assert cache.embed_timeouts == 1
@@ -0,0 +1,130 @@
+import asyncio
+import contextlib
+import types
+
+import numpy as np
+import pytest
+
+import main
+from main import ToxicityScorer
+
+class StubTokenizer:
+    """One token per word; pads with zeros and records each padded batch shape"""
+
+    def __init__(self):
+        self.padded_shapes = []
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        input_ids = [[1] * min(len(text.split()), max_length) for text in texts]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, features, return_tensors="pt"):
+        width = max(len(ids) for ids in features["input_ids"])
+        padded = {key: np.array([row + [0] * (width - len(row)) for row in rows]) for key, rows in features.items()}
+        self.padded_shapes.append(padded["input_ids"].shape)
+        return padded
+
+class StubModel:
+    """Logit for the toxic label is the number of real tokens, so scores reveal lengths"""
+
+    config = types.SimpleNamespace(id2label={0: "non_toxic", 1: "toxic"})
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask):
+        lengths = attention_mask.sum(axis=1).astype(np.float64)
+        return types.SimpleNamespace(logits=np.stack([-lengths, lengths], axis=1))
+
+class StubTorch:
+    def __init__(self):
+        self.threads = 8
+        self.thread_history = []
+
+    def get_num_threads(self):
+        return self.threads
+
+    def set_num_threads(self, threads):
+        self.threads = threads
+        self.thread_history.append(threads)
+
+    def inference_mode(self):
+        return contextlib.nullcontext()
+
+    @staticmethod
+    def sigmoid(values):
+        return 1 / (1 + np.exp(-values))
+
+@pytest.fixture
+def scorer(monkeypatch):
+    tokenizer = StubTokenizer()
+    stub_torch = StubTorch()
+    monkeypatch.setattr(main, "torch", stub_torch, raising=False)
+    monkeypatch.setattr(main, "AutoTokenizer", types.SimpleNamespace(from_pretrained=lambda name: tokenizer), raising=False)
+    monkeypatch.setattr(main, "AutoModelForSequenceClassification",
+                        types.SimpleNamespace(from_pretrained=lambda name: StubModel()), raising=False)
+    scorer = ToxicityScorer("stub", quantize=False, num_threads=2, max_batch_size=4, max_wait_ms=1, cache_size=3)
+    yield scorer
+    scorer.executor.shutdown(wait=True)
+
+def _expected(words):
+    return round(float(1 / (1 + np.exp(-words))), 4)
+
+def test_batches_are_bucketed_by_length(scorer):
+    texts = ["word " * n for n in (3, 40, 5, 100, 2, 30, 7, 9, 11)]
+
+    scores = scorer.score_batch_sync(texts)
+
+    assert scores == [_expected(len(text.split())) for text in texts]
+    # Six texts fit the 16-token bucket and split into batches of 4 and 2; each longer
+    # text gets its own bucket instead of padding the short ones to 100 tokens
+    assert sorted(scorer.tokenizer.padded_shapes, key=lambda shape: shape[1]) == [
+        (4, 7), (2, 11), (1, 30), (1, 40), (1, 100)
+    ]
+    assert scorer.batches_run == 5
+
+def test_thread_count_is_restored_after_each_batch(scorer):
+    scorer.score_batch_sync(["a b c"])
+
+    assert main.torch.thread_history == [2, 8]
+    assert main.torch.get_num_threads() == 8
+
+def test_concurrent_scores_share_batches_and_cache(scorer):
+    async def run():
+        first = await scorer.score_many(["one two", "one two", "three words here", "x"])
+        again = await scorer.score("one two")
+        assert not scorer._tasks
+        return first, again
+
+    first, again = asyncio.run(run())
+
+    assert first == [_expected(2), _expected(2), _expected(3), _expected(1)]
+    assert again == _expected(2)
+    assert scorer.texts_scored == 3
+    assert scorer.cache_hits == 1
+
+def test_cache_evicts_least_recently_used(scorer):
+    async def run():
+        for text in ("a", "a b", "a b c", "a", "a b c d", "a", "a b"):
+            await scorer.score(text)
+
+    asyncio.run(run())
+
+    # "a" was refreshed by its hits, so "a b" was the entry evicted and scored again
+    assert len(scorer.cache) == 3
+    assert scorer.cache_hits == 2
+    assert scorer.texts_scored == 5
+
+def test_scorer_failure_keeps_generated_prompts(monkeypatch):
+    class FailingScorer:
+        async def score_many(self, texts):
+            raise RuntimeError("inference failed")
+
+    monkeypatch.setattr(main, "toxicity_scorer", FailingScorer())
+    request = main.JailbreakRequest(target_behavior="x", techniques=["roleplay"], score_toxicity=True, deadline_ms=0)
+
+    response = asyncio.run(main.AdvancedJailbreakGenerator().generate_jailbreaks(request))
+
+    assert response.prompts
+    assert response.generation_metadata["toxicity_error"] == "inference failed"
+    assert all("toxicity" not in prompt for prompt in response.prompts)